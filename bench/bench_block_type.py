@@ -0,0 +1,77 @@
+"""Compare block_to_block_type with the regex chain it replaced.
+
+Classifies every block of a synthetic corpus (see corpus.py) with both
+implementations, checks they agree and prints the time per block for each.
+
+Usage: python3 bench/bench_block_type.py [--pages N] [--seed S] [--repeat N]
+"""
+import argparse, re, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import CorpusGenerator
+from mdhandler import BlockType, block_to_block_type, markdown_to_blocks, read_file
+
+def regex_block_to_block_type(block):
+    lines = block.split("\n")
+    for level in range(1, 7):
+        if re.match(rf'^#{{{level}}}\s', block):
+            return BlockType[f'HEADING_{level}']
+    if re.match(r'\A`{3}', block) and re.search(r'`{3}\Z', block):
+        return BlockType.CODE
+    if re.match(r'^>', block):
+        for line in lines:
+            if not line.startswith(">"):
+                return BlockType.PARAGRAPH
+        return BlockType.QUOTE
+    if re.match(r'^-\s', block):
+        for line in lines:
+            if not line.startswith("- "):
+                return BlockType.PARAGRAPH
+        return BlockType.UNORDERED_LIST
+    if re.match(r'^1\.\s', block):
+        i = 1
+        for line in lines:
+            if not line.startswith(f"{i}. "):
+                return BlockType.PARAGRAPH
+            i += 1
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def best_of(repeat, classify, blocks):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            classify(block)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark block classification.')
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = CorpusGenerator(args.pages, args.seed).write(Path(tmp))
+        blocks = [block for path in sorted((root / 'content').rglob('*.md'))
+                  for block in markdown_to_blocks(read_file(path))]
+
+    mismatches = [block for block in blocks if block_to_block_type(block) != regex_block_to_block_type(block)]
+    if mismatches:
+        print(f'{len(mismatches)} block(s) classified differently, first: {mismatches[0]!r}')
+        return 1
+
+    before = best_of(args.repeat, regex_block_to_block_type, blocks)
+    after = best_of(args.repeat, block_to_block_type, blocks)
+    print(f'{len(blocks)} blocks')
+    print(f'regex chain   {before * 1000:8.2f} ms  {before / len(blocks) * 1e6:6.2f} us/block')
+    print(f'dispatch      {after * 1000:8.2f} ms  {after / len(blocks) * 1e6:6.2f} us/block  ({before / after:.1f}x)')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
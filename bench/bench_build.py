@@ -0,0 +1,152 @@
+"""Per-stage build benchmarks with a regression gate.
+
+    python3 bench/bench_build.py run [--pages N] [--seed S] [--mix ...] [--output results.json]
+                                     [--baseline old.json] [--threshold 0.10]
+    python3 bench/bench_build.py compare old.json new.json [--threshold 0.10]
+
+`run` generates a synthetic corpus (see corpus.py), times each stage of the
+build separately and writes the results as JSON. `compare` (or `run` with
+--baseline) exits with status 1 when any stage got slower than the baseline
+by more than the threshold.
+"""
+import argparse, io, json, platform, sys, tempfile, time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import CorpusGenerator, parse_mix
+from mdhandler import (BlockType, HEADING_TYPES, INLINE_CACHE, block_to_block_type, generate_page, markdown_to_blocks,
+                       markdown_to_html_node, read_file, text_to_textnodes)
+
+def inline_inputs(blocks):
+    """The inline text the renderer passes to text_to_textnodes for these blocks."""
+    lines = []
+    for block in blocks:
+        block_type = block_to_block_type(block)
+        if block_type == BlockType.CODE:
+            continue
+        for line in block.split('\n'):
+            if block_type in HEADING_TYPES:
+                line = line.lstrip('#').strip()
+            elif block_type == BlockType.QUOTE:
+                line = line.lstrip('>').strip()
+            elif block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+                line = line.split(' ', 1)[1]
+            if line.strip():
+                lines.append(line)
+    return lines
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        # Every run starts cold so repeats don't time cache hits from the last one
+        INLINE_CACHE.clear()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_stages(root, repeat):
+    sources = sorted((root / 'content').rglob('*.md'))
+    template = root / 'template.html'
+    public = root / 'public'
+    public.mkdir(exist_ok=True)
+
+    documents = [read_file(path) for path in sources]
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    lines = inline_inputs(blocks)
+    trees = [markdown_to_html_node(document) for document in documents]
+    rendered = [tree.to_html() for tree in trees]
+    outputs = [public / f'page-{number}.html' for number in range(len(sources))]
+
+    def write_outputs():
+        for path, html in zip(outputs, rendered):
+            with open(path, 'w') as file:
+                file.write(html)
+
+    def generate_pages():
+        with redirect_stdout(io.StringIO()):
+            for source, output in zip(sources, outputs):
+                generate_page(str(source), str(template), str(output))
+
+    stages = {
+        'read': (len(sources), lambda: [read_file(path) for path in sources]),
+        'markdown_to_blocks': (len(documents), lambda: [markdown_to_blocks(doc) for doc in documents]),
+        'block_to_block_type': (len(blocks), lambda: [block_to_block_type(block) for block in blocks]),
+        'text_to_textnodes': (len(lines), lambda: [text_to_textnodes(line) for line in lines]),
+        'markdown_to_html_node': (len(documents), lambda: [markdown_to_html_node(doc) for doc in documents]),
+        'to_html': (len(trees), lambda: [tree.to_html() for tree in trees]),
+        'write': (len(outputs), write_outputs),
+        'generate_page': (len(sources), generate_pages),
+    }
+    results = {}
+    for name, (items, func) in stages.items():
+        seconds = best_of(repeat, func)
+        results[name] = {'seconds': seconds, 'items': items, 'per_item_us': seconds / max(items, 1) * 1e6}
+    return results
+
+def compare(baseline, current, threshold):
+    """Return the stages whose time grew by more than `threshold` (a fraction)."""
+    regressions = []
+    for name, result in current['stages'].items():
+        before = baseline['stages'].get(name)
+        if not before:
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] else 1.0
+        status = 'REGRESSION' if ratio > 1 + threshold else 'ok'
+        print(f"{name:24} {before['seconds'] * 1000:10.2f} ms -> {result['seconds'] * 1000:10.2f} ms  {ratio:6.2f}x  {status}")
+        if status != 'ok':
+            regressions.append(name)
+    return regressions
+
+def load(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def command_run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = CorpusGenerator(args.pages, args.seed, parse_mix(args.mix)).write(Path(tmp))
+        stages = run_stages(root, args.repeat)
+    results = {
+        'meta': {
+            'pages': args.pages, 'seed': args.seed, 'mix': parse_mix(args.mix), 'repeat': args.repeat,
+            'python': platform.python_version(), 'machine': platform.machine(),
+        },
+        'stages': stages,
+    }
+    for name, result in stages.items():
+        print(f"{name:24} {result['seconds'] * 1000:10.2f} ms  {result['items']:8d} items  {result['per_item_us']:10.2f} us/item")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        return 1 if compare(load(args.baseline), results, args.threshold) else 0
+    return 0
+
+def command_compare(args):
+    return 1 if compare(load(args.baseline), load(args.current), args.threshold) else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-stage build benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='generate a corpus and time each stage')
+    run.add_argument('--pages', type=int, default=200)
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('--mix', help='corpus mix overrides, e.g. code=3,image=0')
+    run.add_argument('--repeat', type=int, default=5, help='runs per stage; the fastest is kept')
+    run.add_argument('--output', help='write results JSON here')
+    run.add_argument('--baseline', help='results JSON to compare against')
+    run.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown per stage (default: 0.10)')
+    run.set_defaults(func=command_run)
+    cmp = commands.add_parser('compare', help='compare two results files')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.10)
+    cmp.set_defaults(func=command_compare)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Report bytes per node for TextNode and the HTML node classes.
+
+Builds the node objects for a large document twice, once with the current
+classes and once with plain __dict__-based copies of their old layout, and
+prints the traced allocation per node for each.
+
+Usage: python3 bench/bench_memory.py [--repeat N]
+"""
+import argparse, sys, tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from htmlnode import LeafNode, ParentNode
+from mdhandler import markdown_to_html_node, text_to_textnodes, read_file
+from textnode import TextNode
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+def load_document(repeat):
+    pages = [read_file(path) for path in sorted((ROOT / 'content').rglob('*.md'))]
+    return '\n\n'.join(pages * repeat)
+
+def traced(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def rebuild(node, leaf_cls, parent_cls, count):
+    count[0] += 1
+    if isinstance(node, ParentNode):
+        children = [rebuild(child, leaf_cls, parent_cls, count) for child in node.children]
+        return parent_cls(node.tag, children=children, props=node.props)
+    return leaf_cls(node.tag, node.value, props=node.props)
+
+def dict_leaf(tag, value, props=None):
+    return DictHTMLNode(tag, value, None, props)
+
+def dict_parent(tag, children=None, props=None):
+    return DictHTMLNode(tag, None, children, props)
+
+def report(name, count, before, after):
+    print(f'{name}: {count} nodes, {before / count:.1f} -> {after / count:.1f} bytes/node '
+          f'({before - after} bytes saved)')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='copies of the site content to concatenate')
+    args = parser.parse_args()
+
+    markdown = load_document(args.repeat)
+    fields = []
+    for line in markdown.split('\n'):
+        try:
+            fields.extend((node.text, node.text_type, node.url) for node in text_to_textnodes(line))
+        except ValueError:
+            # code block lines are not inline markdown
+            continue
+    _, before = traced(lambda: [DictTextNode(*f) for f in fields])
+    _, after = traced(lambda: [TextNode(*f) for f in fields])
+    report('TextNode', len(fields), before, after)
+
+    tree = markdown_to_html_node(markdown)
+    count = [0]
+    _, before = traced(lambda: rebuild(tree, dict_leaf, dict_parent, count))
+    count = [0]
+    _, after = traced(lambda: rebuild(tree, LeafNode, ParentNode, count))
+    report('HTMLNode', count[0], before, after)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Deterministic synthetic content trees for benchmarks.
+
+    python3 bench/corpus.py OUTPUT_DIR [--pages N] [--seed S] [--mix paragraph=4,code=1]
+
+writes OUTPUT_DIR/content, OUTPUT_DIR/static and OUTPUT_DIR/template.html,
+laid out like the real site, so the build can be run from OUTPUT_DIR.
+"""
+import argparse, random, shutil, struct, zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Relative weights of the block kinds and inline spans in generated pages
+DEFAULT_MIX = {
+    'heading': 2,
+    'paragraph': 6,
+    'list': 2,
+    'ordered': 1,
+    'quote': 1,
+    'code': 1,
+    'boilerplate': 0,
+    'link': 2,
+    'image': 1,
+    'bold': 2,
+    'italic': 2,
+    'inline_code': 1,
+}
+BLOCK_KINDS = ['heading', 'paragraph', 'list', 'ordered', 'quote', 'code', 'boilerplate']
+INLINE_KINDS = ['plain', 'link', 'image', 'bold', 'italic', 'inline_code']
+IMAGE_COUNT = 8
+# Blocks repeated verbatim across pages, like navigation and footers
+BOILERPLATE = [
+    '- [Home](/)\n- [Blog](/blog)\n- [Contact](/contact)',
+    'Written in the **Shire**, all rights reserved. See the [license](/license) for details.',
+    '> _Not all those who wander are lost._',
+]
+WORDS = (
+    'the ring elves hobbit shire wizard river mountain road tower king forest '
+    'song star light shadow gate bridge fire stone path sword council journey'
+).split()
+
+def parse_mix(text):
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (text or '').split(',')):
+        key, _, value = item.partition('=')
+        if key not in mix:
+            raise ValueError(f"Unknown mix key '{key}', expected one of {', '.join(mix)}")
+        mix[key] = float(value)
+    return mix
+
+class CorpusGenerator:
+    def __init__(self, pages=100, seed=1, mix=None, blocks_per_page=30):
+        self.pages = pages
+        self.rng = random.Random(seed)
+        self.mix = dict(DEFAULT_MIX, **(mix or {}))
+        self.blocks_per_page = blocks_per_page
+        self.block_weights = [self.mix[kind] for kind in BLOCK_KINDS]
+        self.inline_weights = [6] + [self.mix[kind] for kind in INLINE_KINDS[1:]]
+
+    def words(self, low=2, high=8):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def inline(self, spans=6):
+        parts = []
+        for kind in self.rng.choices(INLINE_KINDS, self.inline_weights, k=spans):
+            if kind == 'link':
+                parts.append(f'[{self.words(1, 4)}](/blog/post-{self.rng.randrange(self.pages):05d})')
+            elif kind == 'image':
+                parts.append(f'![{self.words(1, 3)}](/images/img-{self.rng.randrange(IMAGE_COUNT)}.png)')
+            elif kind == 'bold':
+                parts.append(f'**{self.words(1, 3)}**')
+            elif kind == 'italic':
+                parts.append(f'_{self.words(1, 3)}_')
+            elif kind == 'inline_code':
+                parts.append(f'`{self.rng.choice(WORDS)}()`')
+            else:
+                parts.append(self.words())
+        return ' '.join(parts)
+
+    def block(self, kind):
+        count = self.rng.randint(2, 6)
+        if kind == 'heading':
+            return f"{'#' * self.rng.randint(2, 6)} {self.inline(2)}"
+        if kind == 'list':
+            return '\n'.join(f'- {self.inline(3)}' for _ in range(count))
+        if kind == 'ordered':
+            return '\n'.join(f'{i}. {self.inline(3)}' for i in range(1, count + 1))
+        if kind == 'quote':
+            return '\n'.join(f'> {self.inline(3)}' for _ in range(count))
+        if kind == 'boilerplate':
+            return self.rng.choice(BOILERPLATE)
+        if kind == 'code':
+            body = '\n'.join(f'    {self.words(2, 6)};' for _ in range(count))
+            return f'```\nfunc {self.rng.choice(WORDS)}() {{\n{body}\n}}\n```'
+        return '\n'.join(self.inline() for _ in range(self.rng.randint(1, 3)))
+
+    def page(self, title):
+        kinds = self.rng.choices(BLOCK_KINDS, self.block_weights, k=self.blocks_per_page)
+        return '\n\n'.join([f'# {title}'] + [self.block(kind) for kind in kinds]) + '\n'
+
+    def write(self, root):
+        """Write the content tree, static assets and template under `root`."""
+        root = Path(root)
+        content = root / 'content'
+        if content.exists():
+            shutil.rmtree(content)
+        (content / 'blog').mkdir(parents=True)
+        (content / 'index.md').write_text(self.page('Synthetic Site'))
+        for number in range(self.pages):
+            post = content / 'blog' / f'post-{number:05d}'
+            post.mkdir()
+            (post / 'index.md').write_text(self.page(f'Post {number}: {self.words(2, 5)}'))
+
+        images = root / 'static' / 'images'
+        images.mkdir(parents=True, exist_ok=True)
+        for number in range(IMAGE_COUNT):
+            (images / f'img-{number}.png').write_bytes(tiny_png(16 * (number + 1), 9 * (number + 1)))
+        shutil.copy2(ROOT / 'static' / 'index.css', root / 'static' / 'index.css')
+        shutil.copy2(ROOT / 'template.html', root / 'template.html')
+        return root
+
+def tiny_png(width, height):
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + b'\x00' * width for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows))
+            + chunk(b'IEND', b''))
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic content tree.')
+    parser.add_argument('output', help='directory to write content/, static/ and template.html into')
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--mix', help='comma separated kind=weight overrides, e.g. code=3,image=0')
+    args = parser.parse_args()
+    CorpusGenerator(args.pages, args.seed, parse_mix(args.mix)).write(args.output)
+
+if __name__ == '__main__':
+    main()
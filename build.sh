@@ -1 +1,2 @@
-python3 src/main.py "/"
\ No newline at end of file
+CACHE_ARCHIVE="${BUILD_CACHE_ARCHIVE:-build-cache.tar.gz}"
+python3 src/main.py "/" --fingerprint --precompress --import-cache "$CACHE_ARCHIVE" --export-cache "$CACHE_ARCHIVE" ${SITE_URL:+--site-url "$SITE_URL"}
\ No newline at end of file
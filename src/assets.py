@@ -0,0 +1,40 @@
+import json, os
+from pathlib import Path
+
+from manifest import hash_file
+
+# Asset types nginx serves with a one-year immutable Cache-Control
+FINGERPRINT_SUFFIXES = {'.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg'}
+FINGERPRINT_LENGTH = 8
+ASSET_MANIFEST_NAME = 'asset-manifest.json'
+
+def fingerprinted_name(name, digest):
+    """`index.css` -> `index.3f9a1c0b.css` for a content hash `digest`."""
+    stem, suffix = os.path.splitext(name)
+    return f'{stem}.{digest[:FINGERPRINT_LENGTH]}{suffix}'
+
+def fingerprint_assets(source_dir, manifest=None):
+    """Map the root-relative URL of each cacheable static file to its fingerprinted URL.
+
+    Hashes come from the build manifest's stat cache when one is given, so
+    unchanged assets are not re-read.
+    """
+    src = Path(source_dir)
+    assets = {}
+    for item in sorted(src.rglob('*')):
+        if item.suffix.lower() not in FINGERPRINT_SUFFIXES or not item.is_file():
+            continue
+        digest = manifest.file_hash(item) if manifest is not None else hash_file(item)
+        relative = item.relative_to(src)
+        url = '/' + relative.as_posix()
+        assets[url] = '/' + relative.with_name(fingerprinted_name(relative.name, digest)).as_posix()
+    return assets
+
+def write_asset_manifest(assets, dest_dir='public'):
+    path = Path(dest_dir) / ASSET_MANIFEST_NAME
+    text = json.dumps(assets, indent=1, sort_keys=True)
+    if path.exists() and path.read_text() == text:
+        return path
+    with open(path, 'w') as file:
+        file.write(text)
+    return path
@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+
+from frontmatter import parse_date, read_front_matter
+from htmlnode import LeafNode, ParentNode
+from manifest import ContentIndex, hash_bytes, hash_text
+from mdhandler import extract_title_from_blocks, iter_markdown_blocks
+from outputwriter import write_if_changed
+from template import load_template, page_url_key
+
+DEFAULT_POST_INDEX_PATH = '.build-cache/posts.json'
+DEFAULT_BLOG_PAGE_SIZE = 10
+BLOG_DIR = 'blog'
+BLOG_TITLE = 'Blog'
+
+def read_post_meta(path):
+    """Title, date, tags and draft flag of a post, without rendering its body.
+
+    Only the front matter is read, plus the blocks up to the first heading
+    when the front matter has no title. Drafts are not scanned for a
+    heading, since an unfinished post may not have one yet.
+    """
+    meta, body_start = read_front_matter(path)
+    draft = bool(meta.get('draft'))
+    title = meta.get('title')
+    if not title and not draft:
+        title = extract_title_from_blocks(iter_markdown_blocks(path, start=body_start))
+    return {'title': title, 'date': meta.get('date'), 'tags': meta.get('tags', []), 'draft': draft}
+
+def page_url(output, dest_dir):
+    """/blog/post for public/blog/post/index.html, like the links in content/."""
+    url = '/' + Path(output).relative_to(dest_dir).as_posix()
+    if url.endswith('/index.html'):
+        return url[:-len('/index.html')] or '/'
+    return url
+
+def _sort_key(post):
+    # Newest first; undated posts after the dated ones, by URL
+    if post['date'] is None:
+        return (1, 0, post['url'])
+    return (0, -parse_date(post['date']).timestamp(), post['url'])
+
+class PostIndex(ContentIndex):
+    """Post metadata keyed by content hash, so unchanged posts are not read again (see ContentIndex)."""
+    def __init__(self, path=DEFAULT_POST_INDEX_PATH, posts=None):
+        super().__init__(path, posts)
+
+    @classmethod
+    def load(cls, path=DEFAULT_POST_INDEX_PATH):
+        return super().load(path)
+
+    def scan(self, pages, dest_dir, manifest=None):
+        """Return the posts among `pages` ((source, output) pairs), sorted by date.
+
+        A post whose metadata can't be read is reported and left out.
+        """
+        listed = []
+        for source, output in pages:
+            try:
+                meta = self.lookup(source, read_post_meta, manifest)
+            except Exception as e:
+                print(f"Failed: {source}: {type(e).__name__}: {e}")
+                continue
+            listed.append(dict(meta, source=str(source), url=page_url(output, dest_dir)))
+        self.forget_unused()
+        return sorted(listed, key=_sort_key)
+
+def listing_url(number):
+    return f'/{BLOG_DIR}' if number == 1 else f'/{BLOG_DIR}/page/{number}'
+
+def listing_output(dest_dir, number):
+    if number == 1:
+        return Path(dest_dir) / BLOG_DIR / 'index.html'
+    return Path(dest_dir) / BLOG_DIR / 'page' / str(number) / 'index.html'
+
+def listing_node(posts, number, count, resolver):
+    """Return (div node, link URLs) for page `number` of `count` of the listing."""
+    links = []
+    items = []
+    for post in posts:
+        links.append(('link', post['url']))
+        # A draft without a title is listed (with --drafts) under its URL
+        children = [LeafNode('a', post['title'] or post['url'], props={'href': resolver.link(post['url'])})]
+        if post['date']:
+            children.append(LeafNode(None, ' '))
+            children.append(LeafNode('time', post['date'], props={'datetime': post['date']}))
+        items.append(ParentNode('li', children))
+    nav = []
+    if number > 1:
+        url = listing_url(number - 1)
+        links.append(('link', url))
+        nav.append(LeafNode('a', 'Newer posts', props={'href': resolver.link(url), 'rel': 'prev'}))
+    nav.append(LeafNode('span', f'Page {number} of {count}'))
+    if number < count:
+        url = listing_url(number + 1)
+        links.append(('link', url))
+        nav.append(LeafNode('a', 'Older posts', props={'href': resolver.link(url), 'rel': 'next'}))
+    node = ParentNode('div', [
+        LeafNode('h1', BLOG_TITLE),
+        ParentNode('ul', items),
+        ParentNode('nav', nav),
+    ])
+    return node, links
+
+def generate_blog_index(pages, template_path, dest_dir, resolver, manifest, index,
+                        page_size=DEFAULT_BLOG_PAGE_SIZE, drafts=False, quiet=False):
+    """Write the paginated post listing for the posts among `pages`.
+
+    `pages` are the (source, output) pairs under content/blog/. A page of
+    the listing is rewritten only when its posts' metadata, the template or
+    the URL settings changed. Returns (generated, unchanged) page counts.
+    """
+    posts = [post for post in index.scan(pages, dest_dir, manifest) if drafts or not post['draft']]
+    count = (len(posts) + page_size - 1) // page_size
+    template_hash = manifest.file_hash(template_path)
+    generated = 0
+    for number in range(1, count + 1):
+        chunk = posts[(number - 1) * page_size:number * page_size]
+        output = listing_output(dest_dir, number)
+        listed = [[post['url'], post['title'], post['date']] for post in chunk]
+        # Building the nodes is cheap; rendering them is left for stale pages
+        node, links = listing_node(chunk, number, count, resolver)
+        inputs = {
+            'listing_hash': hash_text(json.dumps([number, count, listed])),
+            'template_hash': template_hash,
+            'urls_hash': hash_text(page_url_key(template_path, resolver, links)),
+        }
+        if manifest.is_fresh(output, inputs) and str(output) in manifest.links:
+            continue
+        if not quiet:
+            print(f"Generating: blog listing page {number} of {count} -> {output}")
+        title = BLOG_TITLE if number == 1 else f'{BLOG_TITLE} - page {number}'
+        template = load_template(template_path, resolver=resolver)
+        data = ''.join(template.iter_render({'Title': title, 'Content': node.iter_html()})).encode('utf-8')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        digest = hash_bytes(data)
+        write_if_changed(output, data, digest)
+        manifest.record(output, inputs, links, digest, len(data), {'title': title, 'date': None, 'tags': []})
+        generated += 1
+    # Drop the pages past the end when the listing got shorter
+    number = count + 1
+    while str(listing_output(dest_dir, number)) in manifest.outputs:
+        manifest.remove_output(listing_output(dest_dir, number), dest_dir)
+        number += 1
+    return generated, count - generated
@@ -0,0 +1,167 @@
+import json, time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PAGE_STAGES = ['read', 'split', 'classify', 'parse', 'render', 'template', 'write']
+DEFAULT_REPORT_PATH = '.build-cache/build-report.json'
+
+class PageStats:
+    """Stage timings and byte sizes for one generated page."""
+    def __init__(self, source, output):
+        self.source = str(source)
+        self.output = str(output)
+        self.stages = dict.fromkeys(PAGE_STAGES, 0.0)
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.inline_hits = 0
+        self.inline_misses = 0
+        self.fragment_hit = False
+        self.output_unchanged = None
+        self.output_hash = None
+        self.page_meta = None
+
+    def add(self, stage, seconds):
+        self.stages[stage] += seconds
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] += time.perf_counter() - start
+
+    def timed_chunks(self, chunks, stage):
+        """Pass chunks through, charging the time spent producing them to `stage`."""
+        iterator = iter(chunks)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield chunk
+        finally:
+            self.stages[stage] += elapsed
+
+    @property
+    def seconds(self):
+        return sum(self.stages.values())
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'output': self.output,
+            'seconds': self.seconds,
+            'input_bytes': self.input_bytes,
+            'output_bytes': self.output_bytes,
+            'inline_hits': self.inline_hits,
+            'inline_misses': self.inline_misses,
+            'fragment_hit': self.fragment_hit,
+            'output_unchanged': self.output_unchanged,
+            'output_hash': self.output_hash,
+            'page_meta': self.page_meta,
+            'stages': self.stages,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['source'], data['output'])
+        stats.stages.update(data['stages'])
+        stats.input_bytes = data['input_bytes']
+        stats.output_bytes = data['output_bytes']
+        stats.inline_hits = data.get('inline_hits', 0)
+        stats.inline_misses = data.get('inline_misses', 0)
+        stats.fragment_hit = data.get('fragment_hit', False)
+        stats.output_unchanged = data.get('output_unchanged')
+        stats.output_hash = data.get('output_hash')
+        stats.page_meta = data.get('page_meta')
+        return stats
+
+class BuildReport:
+    """Collects per-page stats and build totals, and writes them as JSON."""
+    def __init__(self, basepath='/', jobs=1):
+        self.basepath = basepath
+        self.jobs = jobs
+        self.started = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.wall_seconds = None
+        self.pages = []
+        self.skipped = 0
+        self.failed = 0
+        self.sections = {}
+
+    def add_page(self, stats):
+        self.pages.append(stats)
+
+    def add_section(self, name, seconds, **counts):
+        self.sections[name] = dict(seconds=seconds, **counts)
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self.start_time
+
+    def totals(self):
+        stages = dict.fromkeys(PAGE_STAGES, 0.0)
+        for page in self.pages:
+            for stage, seconds in page.stages.items():
+                stages[stage] += seconds
+        return {
+            'pages': len(self.pages) + self.skipped + self.failed,
+            'generated': len(self.pages),
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'input_bytes': sum(page.input_bytes for page in self.pages),
+            'output_bytes': sum(page.output_bytes for page in self.pages),
+            'inline_hits': sum(page.inline_hits for page in self.pages),
+            'inline_misses': sum(page.inline_misses for page in self.pages),
+            'fragment_hits': sum(1 for page in self.pages if page.fragment_hit),
+            'unchanged_outputs': sum(1 for page in self.pages if page.output_unchanged),
+            'stages': stages,
+        }
+
+    def slowest(self, count):
+        return sorted(self.pages, key=lambda page: page.seconds, reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            'started': self.started.isoformat(),
+            'wall_seconds': self.wall_seconds,
+            'basepath': self.basepath,
+            'jobs': self.jobs,
+            'totals': self.totals(),
+            'sections': self.sections,
+            'pages': [page.to_dict() for page in self.pages],
+        }
+
+    def write(self, path=DEFAULT_REPORT_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=1)
+
+    def summary(self, top=5):
+        totals = self.totals()
+        lines = [
+            f"Built {totals['generated']} page(s), skipped {totals['skipped']}, failed {totals['failed']}"
+            + (f" in {self.wall_seconds:.2f}s" if self.wall_seconds is not None else ''),
+            '  ' + ', '.join(f'{stage} {seconds * 1000:.1f}ms' for stage, seconds in totals['stages'].items()),
+        ]
+        lookups = totals['inline_hits'] + totals['inline_misses']
+        if lookups:
+            lines.append(f"  inline cache: {totals['inline_hits']} hits, {totals['inline_misses']} misses"
+                         f" ({totals['inline_hits'] / lookups:.0%} hit rate)")
+        if totals['unchanged_outputs']:
+            lines.append(f"  {totals['unchanged_outputs']} output(s) identical to the previous build, not rewritten")
+        if totals['fragment_hits']:
+            lines.append(f"  {totals['fragment_hits']} page(s) reused cached content")
+        slowest = self.slowest(top)
+        if slowest:
+            lines.append(f'Slowest {len(slowest)} page(s):')
+            for page in slowest:
+                lines.append(f'  {page.seconds * 1000:8.1f}ms  {page.input_bytes:>9}B -> {page.output_bytes:>9}B  {page.source}')
+        return '\n'.join(lines)
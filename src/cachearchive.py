@@ -0,0 +1,131 @@
+import io, json, os, re, shutil, tarfile, time
+from pathlib import Path
+
+from manifest import MANIFEST_VERSION
+from mdhandler import RENDERER_VERSION
+
+CACHE_ARCHIVE_FORMAT = 'static-website-build-cache'
+CACHE_ARCHIVE_VERSION = 1
+DEFAULT_CACHE_DIR = '.build-cache'
+HEADER_NAME = 'cache-format.json'
+# Everything an archive may hold besides the header; the build report and
+# temp files stay local
+MEMBER_RE = re.compile(r'(manifest\.json|images\.json|posts\.json|fragments/[0-9a-f]{2}/[0-9a-f]{64}\.json)')
+
+class CacheArchiveError(Exception):
+    pass
+
+def _cache_members(cache_dir):
+    cache_dir = Path(cache_dir)
+    names = []
+    for item in sorted(cache_dir.rglob('*')):
+        name = item.relative_to(cache_dir).as_posix()
+        if item.is_file() and MEMBER_RE.fullmatch(name):
+            names.append(name)
+    return names
+
+def export_cache(archive_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Pack the build caches into one gzipped tarball and return the number of files.
+
+    The archive holds the build manifest (source and output hashes), the
+    image and post indexes and the rendered fragments, behind a header naming the
+    archive, renderer and manifest versions. It is written to a temp file
+    and renamed, so an interrupted export never leaves a truncated archive.
+    """
+    names = _cache_members(cache_dir)
+    header = json.dumps({
+        'format': CACHE_ARCHIVE_FORMAT,
+        'version': CACHE_ARCHIVE_VERSION,
+        'renderer_version': RENDERER_VERSION,
+        'manifest_version': MANIFEST_VERSION,
+        'files': len(names),
+    }).encode('utf-8')
+    archive_path = Path(archive_path)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(f'.{archive_path.name}.{os.getpid()}.tmp')
+    try:
+        with tarfile.open(tmp_path, 'w:gz') as archive:
+            info = tarfile.TarInfo(HEADER_NAME)
+            info.size = len(header)
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(header))
+            for name in names:
+                archive.add(Path(cache_dir) / name, arcname=name, recursive=False)
+        tmp_path.replace(archive_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    return len(names)
+
+def _read_json(archive, member):
+    raw = archive.extractfile(member).read()
+    try:
+        return raw, json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CacheArchiveError(f'{member.name} is not valid JSON: {e}')
+
+def _check_header(header):
+    if not isinstance(header, dict) or header.get('format') != CACHE_ARCHIVE_FORMAT:
+        raise CacheArchiveError('not a build cache archive')
+    for field, expected in [('version', CACHE_ARCHIVE_VERSION), ('renderer_version', RENDERER_VERSION),
+                            ('manifest_version', MANIFEST_VERSION)]:
+        if header.get(field) != expected:
+            raise CacheArchiveError(f'stale archive: {field} {header.get(field)!r}, expected {expected!r}')
+
+def _check_member(name, data):
+    if name == 'manifest.json':
+        valid = isinstance(data, dict) and data.get('version') == MANIFEST_VERSION
+    elif name in ('images.json', 'posts.json'):
+        valid = isinstance(data, dict)
+    else:
+        valid = isinstance(data, dict) and {'title', 'html', 'links'} <= data.keys()
+    if not valid:
+        raise CacheArchiveError(f'{name} has an unexpected layout')
+
+def import_cache(archive_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Unpack an archive written by export_cache into `cache_dir` and return the number of files.
+
+    The header must match this build's versions, and every member must be
+    a regular file with one of the cache's own names and valid content;
+    anything else raises CacheArchiveError. Files are unpacked into a
+    staging directory first, so the existing caches are replaced only once
+    the whole archive has been validated.
+    """
+    cache_dir = Path(cache_dir)
+    staging = cache_dir.with_name(f'{cache_dir.name}.import-{os.getpid()}')
+    try:
+        with tarfile.open(archive_path, 'r:gz') as archive:
+            header = archive.next()
+            if header is None or header.name != HEADER_NAME or not header.isfile():
+                raise CacheArchiveError('not a build cache archive')
+            _check_header(_read_json(archive, header)[1])
+            names = []
+            while (member := archive.next()) is not None:
+                if not member.isfile() or not MEMBER_RE.fullmatch(member.name):
+                    raise CacheArchiveError(f'unexpected member {member.name!r}')
+                raw, data = _read_json(archive, member)
+                _check_member(member.name, data)
+                path = staging / member.name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(raw)
+                # Fragment mtimes order the LRU pruning
+                os.utime(path, (member.mtime, member.mtime))
+                names.append(member.name)
+    except (OSError, EOFError, tarfile.TarError) as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise CacheArchiveError(f'cannot read {archive_path}: {e}')
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for name in ['manifest.json', 'images.json', 'posts.json']:
+        if (cache_dir / name).exists():
+            (cache_dir / name).unlink()
+    shutil.rmtree(cache_dir / 'fragments', ignore_errors=True)
+    if staging.exists():
+        for item in staging.iterdir():
+            item.replace(cache_dir / item.name)
+        staging.rmdir()
+    return len(names)
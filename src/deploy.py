@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+from manifest import save_json
+
+DEPLOY_MANIFEST_VERSION = 1
+DEFAULT_DEPLOY_MANIFEST_PATH = '.build-cache/deploy-manifest.json'
+
+def snapshot_outputs(dest_dir, manifest):
+    """Map every file under `dest_dir` (relative posix path) to its hash and size.
+
+    Hashes come from the manifest's stat cache; pages recorded with their
+    output hash are already in it, so only new or rewritten assets are read.
+    """
+    dest = Path(dest_dir)
+    tree = {}
+    for item in sorted(dest.rglob('*')):
+        if not item.is_file():
+            continue
+        digest = manifest.file_hash(item)
+        tree[item.relative_to(dest).as_posix()] = {'hash': digest, 'size': manifest.files[str(item)]['size']}
+    return tree
+
+def deploy_delta(previous, current):
+    """Compare two output snapshots and return the added, modified and deleted files."""
+    delta = {'added': [], 'modified': [], 'deleted': [], 'unchanged': 0}
+    for path, entry in current.items():
+        before = previous.get(path)
+        if before is None:
+            delta['added'].append(dict(path=path, **entry))
+        elif before['hash'] != entry['hash']:
+            delta['modified'].append(dict(path=path, **entry))
+        else:
+            delta['unchanged'] += 1
+    for path in sorted(set(previous) - set(current)):
+        delta['deleted'].append(dict(path=path, **previous[path]))
+    return delta
+
+def update_deploy_manifest(dest_dir, manifest, path=DEFAULT_DEPLOY_MANIFEST_PATH):
+    """Write the files that changed in `dest_dir` since the previous build and return the delta.
+
+    The snapshot of this build replaces the previous one in the build
+    manifest, so the next build is compared against this one. Upload
+    tooling only needs to transfer `added` and `modified` and remove
+    `deleted`.
+    """
+    dest = Path(dest_dir)
+    current = snapshot_outputs(dest, manifest)
+    previous = manifest.replace_output_tree(current)
+    delta = deploy_delta(previous, current)
+    for entry in delta['deleted']:
+        manifest.files.pop(str(dest / entry['path']), None)
+    data = {
+        'version': DEPLOY_MANIFEST_VERSION,
+        'generated': datetime.now(timezone.utc).isoformat(),
+        'root': str(dest),
+        **delta,
+    }
+    save_json(path, data, sort_keys=False)
+    return delta
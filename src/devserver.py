@@ -0,0 +1,159 @@
+import glob, os, threading, time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+LIVERELOAD_PATH = '/__livereload'
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = () => location.reload();</script>'
+).encode('utf-8')
+
+class Watcher:
+    """Polls files and directory trees for changes by comparing stat snapshots.
+
+    A path may also be a glob such as `templates/*.html`; it is expanded on
+    every scan, so matching files created later are picked up too.
+    """
+    def __init__(self, paths):
+        self.paths = [Path(path) for path in paths]
+        self.snapshot = self.scan()
+
+    def _scan_dir(self, directory, snapshot):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                self._scan_dir(entry.path, snapshot)
+            else:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+    def scan(self):
+        snapshot = {}
+        for pattern in self.paths:
+            matches = sorted(pattern.parent.glob(pattern.name)) if glob.has_magic(pattern.name) else [pattern]
+            for path in matches:
+                if path.is_dir():
+                    self._scan_dir(str(path), snapshot)
+                elif path.exists():
+                    stat = path.stat()
+                    snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self):
+        """Return the sorted paths created, modified or removed since the last poll."""
+        snapshot = self.scan()
+        changed = {path for path, stat in snapshot.items() if self.snapshot.get(path) != stat}
+        changed.update(set(self.snapshot) - set(snapshot))
+        self.snapshot = snapshot
+        return sorted(changed)
+
+class LiveReload:
+    """Tracks a reload generation that event-stream clients wait on."""
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+def inject_livereload(html):
+    index = html.rfind(b'</body>')
+    if index == -1:
+        return html + LIVERELOAD_SCRIPT
+    return html[:index] + LIVERELOAD_SCRIPT + html[index:]
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    # Serves the output directory, adds the reload script to HTML pages and
+    # keeps an event stream open for each page to be told when to reload
+    def __init__(self, *args, livereload=None, **kwargs):
+        self.livereload = livereload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        if url_path == LIVERELOAD_PATH:
+            self.stream_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and url_path.endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if not path.endswith('.html') or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, 'rb') as file:
+            body = inject_livereload(file.read())
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        generation = self.livereload.generation
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        try:
+            while True:
+                current = self.livereload.wait(generation, timeout=15)
+                if current == generation:
+                    self.wfile.write(b': keep-alive\n\n')
+                else:
+                    generation = current
+                    self.wfile.write(b'data: reload\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def start_server(directory, port, livereload):
+    handler = partial(LiveReloadHandler, directory=str(directory), livereload=livereload)
+    server = ThreadingHTTPServer(('', port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def watch_and_serve(paths, rebuild, directory='public', port=8888, interval=0.05):
+    """Serve `directory` and call `rebuild(changed_paths)` whenever a watched path changes.
+
+    Connected browsers are told to reload after each successful rebuild.
+    Runs until interrupted.
+    """
+    livereload = LiveReload()
+    server = start_server(directory, port, livereload)
+    watcher = Watcher(paths)
+    print(f"Serving {directory} at http://localhost:{server.server_address[1]}/ (watching {', '.join(map(str, paths))})")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            try:
+                rebuild(changed)
+            except Exception as e:
+                print(f"Rebuild failed: {e}")
+                continue
+            livereload.notify()
+            print(f"Rebuilt {len(changed)} change(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,82 @@
+import json, os
+from pathlib import Path
+
+from manifest import hash_text
+
+DEFAULT_FRAGMENT_CACHE_PATH = '.build-cache/fragments'
+DEFAULT_FRAGMENT_CACHE_SIZE = 256 * 1024 * 1024
+
+class FragmentCache:
+    """Rendered page content kept on disk between builds.
+
+    Each entry holds the title, the HTML of the content `div` and the
+    page's link URLs for one markdown source, keyed by the source text,
+    the renderer version and the shared URL settings (URLResolver.key);
+    `urls` holds URLResolver.links_key of those links, so a caller can tell
+    when a fingerprinted name they use changed. A template change can then
+    refill the template without parsing any markdown. Reading an entry
+    touches it, so `prune` evicts the least recently used entries first.
+    Entries are written atomically, so worker processes can share the
+    directory.
+    """
+    def __init__(self, path=DEFAULT_FRAGMENT_CACHE_PATH):
+        self.path = Path(path)
+
+    def key(self, markdown, renderer_version, resolver_key):
+        return hash_text(f'{renderer_version}\0{resolver_key}\0{markdown}')
+
+    def _entry_path(self, key):
+        return self.path / key[:2] / f'{key}.json'
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key, title, html, links, urls=None):
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as file:
+            json.dump({'title': title, 'html': html, 'links': [list(link) for link in links], 'urls': urls}, file)
+        tmp_path.replace(path)
+
+    def entries(self):
+        """Return (mtime_ns, size, path) for every entry, oldest first."""
+        entries = []
+        if not self.path.is_dir():
+            return entries
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def prune(self, max_bytes=DEFAULT_FRAGMENT_CACHE_SIZE):
+        """Evict least recently used entries until the cache fits in `max_bytes`.
+
+        Returns (removed, kept_bytes).
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                # Fails while the shard directory still holds other entries
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+            total -= size
+            removed += 1
+        return removed, total
@@ -0,0 +1,133 @@
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+FRONT_MATTER_DELIMITER = '---'
+KEY_RE = re.compile(r'([A-Za-z_][\w-]*):(.*)')
+TRUE_VALUES = {'true', 'yes', 'on'}
+FALSE_VALUES = {'false', 'no', 'off'}
+
+class FrontMatterError(ValueError):
+    def __init__(self, source, line, message):
+        self.source = source
+        self.line = line
+        super().__init__(f'{source}:{line}: {message}')
+
+def _scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+def _list(value):
+    value = value.strip()
+    if value.startswith('[') and value.endswith(']'):
+        value = value[1:-1]
+    return [item for item in map(_scalar, value.split(',')) if item]
+
+def _check(meta, lines, source):
+    # Types for the keys the build understands; other keys stay strings
+    if 'title' in meta and (not isinstance(meta['title'], str) or not meta['title']):
+        raise FrontMatterError(source, lines['title'], 'title must be a non-empty string')
+    if 'date' in meta:
+        try:
+            if not isinstance(meta['date'], str):
+                raise ValueError
+            parse_date(meta['date'])
+        except ValueError:
+            raise FrontMatterError(source, lines['date'], f"date must be YYYY-MM-DD, got {meta['date']!r}")
+    if 'tags' in meta and isinstance(meta['tags'], str):
+        meta['tags'] = _list(meta['tags'])
+    if 'draft' in meta:
+        flag = str(meta['draft']).lower()
+        if flag not in TRUE_VALUES | FALSE_VALUES:
+            raise FrontMatterError(source, lines['draft'], f"draft must be true or false, got {meta['draft']!r}")
+        meta['draft'] = flag in TRUE_VALUES
+    if 'template' in meta and (not isinstance(meta['template'], str) or not meta['template']):
+        raise FrontMatterError(source, lines['template'], 'template must be a file name')
+    return meta
+
+def parse_date(value):
+    """A front matter date as a datetime; plain dates are midnight."""
+    if len(value) == 10:
+        return datetime.combine(date.fromisoformat(value), datetime.min.time())
+    return datetime.fromisoformat(value)
+
+def parse_front_matter(lines, source='<string>', first_line=2):
+    """Parse the lines between the `---` delimiters.
+
+    A YAML subset: `key: value` pairs, values optionally quoted, lists as
+    `[a, b]` or as `- item` lines under an empty `key:`, and `#` comments.
+    `first_line` is the file line number of lines[0], for error messages.
+    """
+    meta = {}
+    key_lines = {}
+    key = None
+    for number, line in enumerate(lines, first_line):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped.startswith('- ') and key is not None and isinstance(meta[key], list):
+            meta[key].append(_scalar(stripped[2:]))
+            continue
+        match = KEY_RE.fullmatch(stripped)
+        if match is None:
+            raise FrontMatterError(source, number, f'expected "key: value", got {stripped!r}')
+        key, value = match.group(1).lower(), match.group(2).strip()
+        if not value:
+            meta[key] = []
+        elif value.startswith('['):
+            meta[key] = _list(value)
+        else:
+            meta[key] = _scalar(value)
+        key_lines[key] = number
+    return _check(meta, key_lines, source)
+
+def split_front_matter(text, source='<string>'):
+    """Return (metadata, body) for markdown text that may start with front matter."""
+    if not text.startswith(FRONT_MATTER_DELIMITER + '\n'):
+        return {}, text
+    lines = text.split('\n')
+    for index in range(1, len(lines)):
+        if lines[index].rstrip() == FRONT_MATTER_DELIMITER:
+            meta = parse_front_matter(lines[1:index], source)
+            return meta, '\n'.join(lines[index + 1:])
+    raise FrontMatterError(source, 1, 'front matter is not closed with ---')
+
+def read_front_matter(path):
+    """Return (metadata, body offset in bytes) reading only the front matter of a file.
+
+    Stops at the closing `---`, or after the first line when the file does
+    not start with front matter, so the body is never read.
+    """
+    with open(path, 'rb') as file:
+        first = file.readline()
+        if first.rstrip(b'\r\n') != FRONT_MATTER_DELIMITER.encode():
+            return {}, 0
+        lines = []
+        for line in file:
+            line = line.decode('utf-8').rstrip('\r\n')
+            if line.rstrip() == FRONT_MATTER_DELIMITER:
+                return parse_front_matter(lines, str(path)), file.tell()
+            lines.append(line)
+    raise FrontMatterError(str(path), 1, 'front matter is not closed with ---')
+
+def page_template(meta, default_template):
+    """The template for a page: `template:` names a file next to the default template."""
+    if 'template' not in meta:
+        return default_template
+    return Path(default_template).parent / meta['template']
+
+def template_pattern(default_template):
+    """Glob for the templates a page can use: files next to the default one with its suffix."""
+    default = Path(default_template)
+    return str(default.parent / f'*{default.suffix}')
+
+def template_values(meta):
+    """Front matter as template placeholder values, e.g. {{ Date }} and {{ Tags }}."""
+    values = {}
+    for key, value in meta.items():
+        if key in ('draft', 'template'):
+            continue
+        values[key.capitalize()] = ', '.join(value) if isinstance(value, list) else value
+    return values
@@ -1,5 +1,10 @@
 
+# Marks an exhausted child iterator; None could be a (bad) child
+_DONE = object()
+
 class HTMLNode:
+    __slots__ = ('tag', 'value', 'children', 'props')
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,6 +13,34 @@ class HTMLNode:
 
     def to_html(self):
         raise NotImplementedError
+
+    def html_parts(self):
+        # (opening html, children, closing html) used by the streaming serializer
+        raise NotImplementedError
+
+    def iter_html(self):
+        """Yield the node's HTML in chunks without recursion.
+
+        The tree is walked with an explicit stack of child iterators, so only
+        the current path is held in memory and depth is not limited by the
+        interpreter's recursion limit.
+        """
+        stack = [(iter((self,)), '')]
+        while stack:
+            children, closing = stack[-1]
+            child = next(children, _DONE)
+            if child is _DONE:
+                stack.pop()
+                if closing:
+                    yield closing
+                continue
+            opening, grandchildren, child_closing = child.html_parts()
+            yield opening
+            if grandchildren or child_closing:
+                stack.append((iter(grandchildren), child_closing))
+
+    def write_to(self, file):
+        file.writelines(self.iter_html())
     
     def props_to_html(self):
         text_str =''
@@ -19,6 +52,8 @@ class HTMLNode:
         return f'HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})'
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         super().__init__(tag, value, None, props)
         if self.value == None and self.tag not in ['img', 'br']:
@@ -32,20 +67,28 @@ class LeafNode(HTMLNode):
         elif self.tag:
             return f'<{self.tag}{" " + self.props_to_html() if self.props else ""}>{self.value}</{self.tag}>'
         return self.value
+
+    def html_parts(self):
+        return self.to_html(), (), ''
     
     def __repr__(self):
         return f'LeafNode({self.tag}, {self.value}, {self.props})'
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, children=None, props=None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
+        return ''.join(self.iter_html())
+
+    def html_parts(self):
         if self.tag == None:
             raise ValueError("tag value cannot be None")
         if self.children == None:
             raise ValueError("parent must have a child node and cannot equal None")
-        return f'<{self.tag}{" " + self.props_to_html() if self.props else ""}>{"".join([child.to_html() for child in self.children])}</{self.tag}>'
+        return f'<{self.tag}{" " + self.props_to_html() if self.props else ""}>', self.children, f'</{self.tag}>'
     
     def __repr__(self):
         return f'ParentNode({self.tag}, {self.children}, {self.props})'
\ No newline at end of file
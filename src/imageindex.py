@@ -0,0 +1,95 @@
+import struct
+from pathlib import Path
+
+from manifest import ContentIndex
+
+DEFAULT_IMAGE_INDEX_PATH = '.build-cache/images.json'
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+# JPEG start-of-frame markers; C4, C8 and CC share the range but are not frames
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers that stand alone without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+def _jpeg_size(file):
+    file.seek(2)
+    while True:
+        byte = file.read(1)
+        while byte == b'\xff':
+            byte = file.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        header = file.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack('>H', header)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return width, height
+        file.seek(length - 2, 1)
+        if file.read(1) != b'\xff':
+            return None
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(header) >= 25:
+        bits = struct.unpack('<I', header[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(header) >= 30:
+        return (int.from_bytes(header[24:27], 'little') + 1,
+                int.from_bytes(header[27:30], 'little') + 1)
+    return None
+
+def read_image_size(path):
+    """Return (width, height) from the header of a PNG, JPEG, GIF or WebP file.
+
+    Only the first few bytes are read (JPEG walks its segment headers), so
+    no image is decoded. Returns None for other or malformed files.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(32)
+        if header.startswith(b'\x89PNG\r\n\x1a\n') and header[12:16] == b'IHDR':
+            return struct.unpack('>II', header[16:24])
+        if header[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', header[6:10])
+        if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+            return _webp_size(header)
+        if header.startswith(b'\xff\xd8'):
+            return _jpeg_size(file)
+    return None
+
+class ImageIndex(ContentIndex):
+    """Image dimensions keyed by content hash, kept between builds.
+
+    `scan` maps the root-relative URL of every image in the static tree to
+    its size; only new images have their header read (see ContentIndex).
+    `urls` holds the result of the last scan.
+    """
+    def __init__(self, path=DEFAULT_IMAGE_INDEX_PATH, sizes=None):
+        super().__init__(path, sizes)
+        self.urls = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_IMAGE_INDEX_PATH):
+        return super().load(path)
+
+    def scan(self, static_dir, manifest=None):
+        src = Path(static_dir)
+        urls = {}
+        for item in sorted(src.rglob('*')):
+            if item.suffix.lower() not in IMAGE_SUFFIXES or not item.is_file():
+                continue
+            size = self.lookup(item, read_image_size, manifest)
+            if size is not None:
+                urls['/' + item.relative_to(src).as_posix()] = tuple(size)
+        self.forget_unused()
+        self.urls = urls
+        return urls
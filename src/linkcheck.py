@@ -0,0 +1,114 @@
+import posixpath
+from pathlib import Path
+from urllib.parse import urlsplit
+
+class BrokenLink:
+    __slots__ = ('source', 'line', 'kind', 'url', 'target')
+
+    def __init__(self, source, line, kind, url, target):
+        self.source = source
+        self.line = line
+        self.kind = kind
+        self.url = url
+        self.target = target
+
+    @property
+    def location(self):
+        return f'{self.source}:{self.line}' if self.line else str(self.source)
+
+    def __str__(self):
+        label = 'Missing image' if self.kind == 'image' else 'Broken link'
+        return f'{label}: {self.location}: {self.url} -> {self.target}'
+
+class BrokenLinksError(Exception):
+    def __init__(self, broken):
+        self.broken = broken
+        super().__init__(f"{len(broken)} broken link(s) or missing image(s)")
+
+def output_url(path, dest_dir):
+    return '/' + Path(path).relative_to(dest_dir).as_posix()
+
+def _line_of(source, url, cache):
+    # Only called for broken links, so sources are read lazily
+    lines = cache.get(source)
+    if lines is None:
+        try:
+            with open(source, 'r') as file:
+                lines = cache[source] = file.read().split('\n')
+        except OSError:
+            lines = cache[source] = []
+    needle = f']({url}'
+    for number, line in enumerate(lines, 1):
+        if needle in line:
+            return number
+    return None
+
+class LinkIndex:
+    """Every URL the build produced, and every link and image URL the pages use.
+
+    Built from the build manifest after the pages are generated, so pages
+    skipped as unchanged are checked too. `check` resolves all links in one
+    pass with set lookups instead of crawling the output.
+    """
+    def __init__(self, dest_dir='public'):
+        self.dest_dir = Path(dest_dir)
+        self.outputs = set()
+        self.pages = []
+
+    @classmethod
+    def from_manifest(cls, manifest, dest_dir='public'):
+        index = cls(dest_dir)
+        for asset in manifest.assets:
+            index.add_output(asset)
+        for output, inputs in manifest.outputs.items():
+            index.add_page(output, inputs.get('source'), manifest.links.get(output, []))
+        return index
+
+    def add_output(self, path):
+        self.outputs.add(output_url(path, self.dest_dir))
+
+    def add_page(self, output, source, links):
+        self.add_output(output)
+        self.pages.append((output_url(output, self.dest_dir), source, links))
+
+    def _site_path(self, url, page_url, kind, resolver):
+        # The site-root path a markdown URL ends up at, or None when it
+        # points off the site
+        parts = urlsplit(url)
+        if parts.scheme or parts.netloc or not parts.path:
+            return None
+        path = parts.path
+        if not path.startswith('/'):
+            return posixpath.normpath(posixpath.join(posixpath.dirname(page_url), path))
+        if resolver is None:
+            return path
+        resolved = urlsplit(resolver.image(path) if kind == 'image' else resolver.link(path)).path
+        if kind == 'image' and resolver.image_prefix is not None:
+            prefix = urlsplit(resolver.image_prefix).path
+        else:
+            prefix = resolver.basepath
+        if not resolved.startswith(prefix):
+            return resolved
+        return '/' + resolved[len(prefix):]
+
+    def exists(self, path):
+        if path in self.outputs:
+            return True
+        return posixpath.join(path, 'index.html') in self.outputs
+
+    def check(self, resolver=None):
+        """Return a BrokenLink for every link or image that matches no output."""
+        broken = []
+        sources = {}
+        for page_url, source, links in self.pages:
+            for kind, url in links:
+                target = self._site_path(url, page_url, kind, resolver)
+                if target is None or self.exists(target):
+                    continue
+                line = _line_of(source, url, sources) if source else None
+                broken.append(BrokenLink(source, line, kind, url, target))
+        return broken
+
+    @property
+    def link_count(self):
+        return sum(len(links) for _, _, links in self.pages)
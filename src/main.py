@@ -1,8 +1,43 @@
-import shutil, sys
+import argparse, io, os, shutil, time
+from functools import partial
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
-from mdhandler import generate_page
+from mdhandler import INLINE_CACHE, RENDERER_VERSION, generate_page, recording_links, set_inline_cache_size
+from manifest import BuildManifest, remove_empty_parents
+from assets import fingerprint_assets, write_asset_manifest
+from outputwriter import OutputWriter
+from fragmentcache import DEFAULT_FRAGMENT_CACHE_SIZE, FragmentCache
+from imageindex import ImageIndex
+from linkcheck import BrokenLinksError, LinkIndex
+from precompress import precompress_tree
+from frontmatter import page_template, read_front_matter, template_pattern
+from template import page_url_key
+from blogindex import BLOG_DIR, DEFAULT_BLOG_PAGE_SIZE, PostIndex, generate_blog_index
+from sitemap import write_site_files
+from deploy import DEFAULT_DEPLOY_MANIFEST_PATH, update_deploy_manifest
+from urlresolver import URLResolver
+from cachearchive import CacheArchiveError, export_cache, import_cache
+from buildreport import BuildReport, PageStats, DEFAULT_REPORT_PATH
 
-def setup_public_directory(source_dir, dest_dir='public', clean=False):
+def _is_synced(src_file, dest_file):
+    try:
+        dest_stat = dest_file.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src_file.stat()
+    return src_stat.st_size == dest_stat.st_size and src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+def sync_public_directory(source_dir, dest_dir='public', manifest=None, assets=None):
+    """Copy only new or changed static files and delete only orphaned ones.
+
+    Files are compared by size and mtime (copy2 preserves the mtime), so an
+    unchanged asset costs one stat call. Generated pages are never touched:
+    orphans are the assets recorded by the previous sync that no longer
+    exist in the source tree. Files listed in `assets` (URL -> fingerprinted
+    URL) are copied under their fingerprinted names.
+    """
     src = Path(source_dir)
     dest = Path(dest_dir)
 
@@ -11,50 +46,43 @@ def setup_public_directory(source_dir, dest_dir='public', clean=False):
     
     if not src.is_dir():
         raise NotADirectoryError(f"Source '{src}' is not a directory")
-    
-    if dest.exists() and clean:
-        print(f"Cleaning destination directory: {dest}")
-        if dest.is_dir():
-            for item in dest.iterdir():
-                if item.is_dir():
-                    shutil.rmtree(item)
-                    print(f"Removed directory: {item}")
-                else:
-                    item.unlink()
-                    print(f"Removed file: {item}")
-        else:
-            dest.unlink()
-            print(f"Removed file: {dest}")
-    
-    print(f'Create destination directory: {dest}')
+
     dest.mkdir(parents=True, exist_ok=True)
 
     files_copied = 0
-    directories_created = 0
-    
-    for item in src.iterdir():
-        dest_item = dest / item.name
-        
+    files_unchanged = 0
+    files_removed = 0
+    synced = []
+
+    for item in sorted(src.rglob('*')):
+        relative = item.relative_to(src)
+        if assets and '/' + relative.as_posix() in assets:
+            relative = Path(assets['/' + relative.as_posix()][1:])
+        dest_item = dest / relative
         if item.is_dir():
-            # Recursive case: create subdirectory and copy its contents
             dest_item.mkdir(exist_ok=True)
-            print(f"Created directory: {dest_item}")
-            directories_created += 1
-            
-            # Recursively copy subdirectory contents
-            sub_files, sub_dirs = setup_public_directory(item, dest_item)
-            files_copied += sub_files
-            directories_created += sub_dirs
-            
+            continue
+
+        synced.append(dest_item)
+        if _is_synced(item, dest_item):
+            files_unchanged += 1
         else:
-            # Base case: copy file
-            shutil.copy2(item, dest_item)  # Preserves metadata
-            print(f"Copied file: {item} -> {dest_item}")
+            shutil.copy2(item, dest_item)
             files_copied += 1
-    
-    return files_copied, directories_created
 
-def generate_pages_recursive(content_dir, template_path, dest_dir, basepath):
+    if manifest is not None:
+        for stale in manifest.replace_assets(synced):
+            stale_path = Path(stale)
+            if stale_path.is_file():
+                stale_path.unlink()
+                files_removed += 1
+                remove_empty_parents(stale_path, dest)
+
+    print(f"Synced {src} -> {dest}: {files_copied} copied, {files_unchanged} unchanged, {files_removed} removed")
+    return files_copied, files_unchanged, files_removed
+
+def collect_pages(content_dir, dest_dir):
+    """Walk the content tree and return sorted (source .md, output .html) pairs."""
     content_path = Path(content_dir)
     dest_path = Path(dest_dir)
     
@@ -64,32 +92,423 @@ def generate_pages_recursive(content_dir, template_path, dest_dir, basepath):
     # Create destination directory if it doesn't exist
     dest_path.mkdir(parents=True, exist_ok=True)
     
-    for item in content_path.iterdir():
+    pages = []
+    for item in sorted(content_path.iterdir()):
         if item.is_dir():
-            # Recursive case: process subdirectory
-            sub_dest = dest_path / item.name
-            generate_pages_recursive(item, template_path, sub_dest, basepath)
+            # Recursive case: collect subdirectory
+            pages.extend(collect_pages(item, dest_path / item.name))
             
         elif item.suffix == '.md':
             # Base case: convert .md file to .html
-            if item.name == 'index.md':
-                # index.md becomes index.html
-                html_file = dest_path / 'index.html'
-            else:
-                # other.md becomes other.html
-                html_file = dest_path / f"{item.stem}.html"
-            
+            pages.append((item, page_output_path(item, dest_path)))
+    return pages
+
+def page_output_path(source, dest_dir):
+    if source.name == 'index.md':
+        # index.md becomes index.html
+        return Path(dest_dir) / 'index.html'
+    # other.md becomes other.html
+    return Path(dest_dir) / f"{source.stem}.html"
+
+class PageBuildError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f'{source}: {error}' for source, error in failures]
+        super().__init__(f"{len(failures)} page(s) failed to build:\n" + "\n".join(lines))
+
+def _render_page(job, writer=None):
+    # Runs in a worker process: capture the page log so the parent can print
+    # it in work-item order, and return errors as text with the source path.
+    source, template_path, html_file, resolver, fragment_cache, verbose = job
+    log = io.StringIO()
+    stats = PageStats(source, html_file)
+    try:
+        with redirect_stdout(log), recording_links() as links:
+            generate_page(str(source), str(template_path), str(html_file), stats=stats, verbose=verbose,
+                          resolver=resolver, fragment_cache=fragment_cache, writer=writer)
+    except Exception as e:
+        return log.getvalue(), f'{type(e).__name__}: {e}', None, None
+    return log.getvalue(), None, stats.to_dict(), links
+
+def generate_pages_recursive(content_dir, template_path, dest_dir, basepath, manifest=None, jobs=1,
+                             report=None, quiet=False, image_prefix=None, assets=None, image_sizes=None,
+                             fragment_cache=None, drafts=False):
+    pages = collect_pages(content_dir, dest_dir)
+    resolver = URLResolver(basepath, image_prefix, assets, image_sizes)
+
+    work = []
+    templates = {}
+    failures = []
+    for item, html_file in pages:
+        # Only the front matter is read here; the body is left to the workers
+        try:
+            meta, _ = read_front_matter(item)
+            if meta.get('draft') and not drafts:
+                # Not marked as seen, so remove_stale deletes an earlier output
+                if not quiet:
+                    print(f"Skipping draft: {item}")
+                continue
+            if manifest is not None:
+                # The links of the last build; an unchanged source still has them
+                template = page_template(meta, template_path)
+                urls = page_url_key(template, resolver, manifest.links.get(str(html_file), ()))
+                inputs = manifest.page_inputs(item, template, urls, RENDERER_VERSION)
+        except (OSError, ValueError) as e:
+            error = f'{type(e).__name__}: {e}'
+            print(f"Failed: {item}: {error}")
+            failures.append((str(item), error))
+            if report is not None:
+                report.failed += 1
+            if manifest is not None:
+                manifest.seen.add(str(html_file))
+            continue
+        if manifest is not None:
+            # Pages built before links were recorded are rebuilt once to record them
+            if manifest.is_fresh(html_file, inputs) and str(html_file) in manifest.links:
+                if not quiet:
+                    print(f"Unchanged: {item} -> {html_file}")
+                if report is not None:
+                    report.skipped += 1
+                continue
+            templates[html_file] = template
+        work.append((item, template_path, html_file, resolver, fragment_cache, not quiet))
+
+    writer = None
+    if jobs > 1 and len(work) > 1:
+        # Workers size their own inline cache like the parent's
+        with ProcessPoolExecutor(max_workers=jobs, initializer=set_inline_cache_size,
+                                 initargs=(INLINE_CACHE.maxsize,)) as executor:
+            chunksize = max(1, len(work) // (jobs * 4))
+            results = list(executor.map(_render_page, work, chunksize=chunksize))
+    else:
+        # Rendered lazily, so each page renders while the previous one is written
+        writer = OutputWriter()
+        results = map(partial(_render_page, writer=writer), work)
+
+    rendered = []
+    for (item, _, html_file, _, _, _), (log, error, stats, links) in zip(work, results):
+        if not quiet:
             print(f"Generating: {item} -> {html_file}")
-            generate_page(str(item), template_path, str(html_file), basepath)
+            print(log, end='')
+        if error is not None:
+            print(f"Failed: {item}: {error}")
+            failures.append((str(item), error))
+            if report is not None:
+                report.failed += 1
+            continue
+        rendered.append((item, html_file, PageStats.from_dict(stats), links))
 
-def main():
-    setup_public_directory('static','public', True)
-    generate_pages_recursive('content', 'template.html', 'public', basepath)
+    write_errors = writer.close() if writer is not None else {}
+    for item, html_file, stats, links in rendered:
+        error = write_errors.get(str(html_file))
+        if error is not None:
+            error = f'{type(error).__name__}: {error}'
+            print(f"Failed: {item}: {error}")
+            failures.append((str(item), error))
+            if report is not None:
+                report.failed += 1
+            continue
+        if writer is not None:
+            stats.output_unchanged = str(html_file) in writer.unchanged
+        if manifest is not None:
+            template = templates[html_file]
+            inputs = manifest.page_inputs(item, template, page_url_key(template, resolver, links), RENDERER_VERSION)
+            manifest.record(html_file, inputs, links, stats.output_hash, stats.output_bytes, stats.page_meta)
+        if report is not None:
+            report.add_page(stats)
 
-if __name__ == '__main__':
-    args = sys.argv
-    if not args[1:]:
-        basepath = '/'
+    if failures:
+        raise PageBuildError(failures)
+    return len(work)
+
+def build_blog_index(content_dir, template_path, dest_dir, resolver, manifest, posts,
+                     page_size=DEFAULT_BLOG_PAGE_SIZE, drafts=False, quiet=False):
+    """Generate the blog listing from content/blog/ unless it has a hand-written index.md.
+
+    `posts` is the build's PostIndex. Returns (generated, unchanged) page counts.
+    """
+    blog_dir = Path(content_dir) / BLOG_DIR
+    if not blog_dir.is_dir():
+        return 0, 0
+    pages = collect_pages(blog_dir, Path(dest_dir) / BLOG_DIR)
+    if any(source == blog_dir / 'index.md' for source, _ in pages):
+        if not quiet:
+            print(f"Not generating the blog listing: {blog_dir / 'index.md'} exists")
+        return 0, 0
+    counts = generate_blog_index(pages, template_path, dest_dir, resolver, manifest, posts, page_size,
+                                 drafts, quiet)
+    posts.save()
+    return counts
+
+def rebuild_changed(changed, basepath, manifest, content_dir='content', template_path='template.html',
+                    static_dir='static', dest_dir='public', image_prefix=None, assets=None, images=None,
+                    fragment_cache=None, drafts=False, posts=None, blog_page_size=DEFAULT_BLOG_PAGE_SIZE,
+                    site_url=None, quiet=False):
+    """Regenerate only the outputs affected by the changed or removed paths.
+
+    `assets` is the fingerprint map of the last build, or None when assets
+    are not fingerprinted; it is updated in place when static files change.
+    `images` is the build's ImageIndex, or None when image sizes are off.
+    `posts` is the build's PostIndex, or None when the blog listing is off.
+    `site_url` is None when no sitemap and feed are written. Pages that
+    fail are reported and raised together as a PageBuildError at the end.
+    """
+    content_path = Path(content_dir).resolve()
+    static_path = Path(static_dir).resolve()
+    template = Path(template_path).resolve()
+    template_changed = False
+    static_changed = False
+    pages = []
+    for changed_path in map(Path, changed):
+        resolved = changed_path.resolve()
+        # The default template or another one next to it that `template:` names
+        if resolved.parent == template.parent and resolved.suffix == template.suffix:
+            template_changed = True
+        elif resolved.is_relative_to(static_path):
+            static_changed = True
+        elif resolved.is_relative_to(content_path) and resolved.suffix == '.md':
+            relative = resolved.relative_to(content_path)
+            source = Path(content_dir) / relative
+            pages.append((source, page_output_path(source, Path(dest_dir) / relative.parent)))
+
+    urls_changed = False
+    if static_changed and assets is not None:
+        fingerprints = fingerprint_assets(static_dir, manifest)
+        if fingerprints != assets:
+            assets.clear()
+            assets.update(fingerprints)
+            write_asset_manifest(assets, dest_dir)
+            urls_changed = True
+    if static_changed and images is not None:
+        previous = images.urls
+        if images.scan(static_dir, manifest) != previous:
+            images.save()
+            urls_changed = True
+    if static_changed:
+        sync_public_directory(static_dir, dest_dir, manifest, assets)
+    image_sizes = images.urls if images is not None else None
+    resolver = URLResolver(basepath, image_prefix, assets, image_sizes)
+    try:
+        if template_changed or urls_changed:
+            # Every page is checked: a template change refills them all, a
+            # changed fingerprint or image size only the pages that use it
+            manifest.seen.clear()
+            generate_pages_recursive(content_dir, template_path, dest_dir, basepath, manifest, quiet=quiet,
+                                     image_prefix=image_prefix, assets=assets, image_sizes=image_sizes,
+                                     fragment_cache=fragment_cache, drafts=drafts)
+            if posts is not None:
+                build_blog_index(content_dir, template_path, dest_dir, resolver, manifest, posts, blog_page_size,
+                                 drafts, quiet)
+            if site_url:
+                write_site_files(dest_dir, manifest, resolver, site_url, quiet)
+            manifest.remove_stale(dest_dir)
+            return
+        failures = []
+        for source, html_file in pages:
+            if not source.exists():
+                manifest.remove_output(html_file, dest_dir)
+                print(f"Removed page: {html_file}")
+                continue
+            # A page that fails is reported and the other changed pages still build
+            try:
+                meta, _ = read_front_matter(source)
+                if meta.get('draft') and not drafts:
+                    manifest.remove_output(html_file, dest_dir)
+                    if not quiet:
+                        print(f"Skipping draft: {source}")
+                    continue
+                html_file.parent.mkdir(parents=True, exist_ok=True)
+                with recording_links() as links:
+                    stats = generate_page(str(source), template_path, str(html_file), verbose=not quiet,
+                                          resolver=resolver, fragment_cache=fragment_cache)
+                template = page_template(meta, template_path)
+                inputs = manifest.page_inputs(source, template, page_url_key(template, resolver, links),
+                                              RENDERER_VERSION)
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+                print(f"Failed: {source}: {error}")
+                failures.append((str(source), error))
+                continue
+            manifest.record(html_file, inputs, links, stats.output_hash, stats.output_bytes, stats.page_meta)
+        blog_path = content_path / BLOG_DIR
+        if posts is not None and any(source.resolve().is_relative_to(blog_path) for source, _ in pages):
+            build_blog_index(content_dir, template_path, dest_dir, resolver, manifest, posts, blog_page_size,
+                             drafts, quiet)
+        if site_url and pages:
+            write_site_files(dest_dir, manifest, resolver, site_url, quiet)
+        if failures:
+            raise PageBuildError(failures)
+    finally:
+        # Keep the record of the pages that did build
+        manifest.save()
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'expected 0 or more, got {value!r}')
+    return number
+
+def site_url_arg(value):
+    parts = urlsplit(value)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise argparse.ArgumentTypeError(f'expected an absolute http(s) URL, got {value!r}')
+    return value
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Build the site from content/ and static/ into public/.')
+    parser.add_argument('basepath', nargs='?', default='/', help='URL prefix for root-relative links (default: /)')
+    parser.add_argument('--image-prefix', metavar='URL',
+                        help='serve root-relative images from this prefix instead, e.g. a CDN URL')
+    parser.add_argument('--inline-cache', type=non_negative_int, default=INLINE_CACHE.maxsize, metavar='N',
+                        help=f'rendered inline lines to keep per process, 0 to disable (default: {INLINE_CACHE.maxsize})')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='number of worker processes for page generation, and threads for --precompress'
+                             ' (0 = one per CPU; default: 1 page worker, compression threads by CPU count)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no per-file logging, only summaries')
+    parser.add_argument('--drafts', action='store_true', help='also build pages marked draft: true')
+    parser.add_argument('--blog-page-size', type=int, default=DEFAULT_BLOG_PAGE_SIZE, metavar='N',
+                        help=f'posts per blog listing page, 0 to not generate the listing (default: {DEFAULT_BLOG_PAGE_SIZE})')
+    parser.add_argument('--site-url', type=site_url_arg, metavar='URL',
+                        help='public URL of the site, e.g. https://example.com; writes sitemap.xml and blog/feed.xml')
+    parser.add_argument('--fingerprint', action='store_true',
+                        help='copy css/js/images under content-hashed names and link to those')
+    parser.add_argument('--no-image-sizes', dest='image_sizes', action='store_false',
+                        help="don't add width/height and lazy-loading attributes to images")
+    parser.add_argument('--strict-links', action='store_true',
+                        help='fail the build when a page links to a missing page or image')
+    parser.add_argument('--no-fragment-cache', dest='fragment_cache', action='store_false',
+                        help="don't reuse rendered page content from earlier builds")
+    parser.add_argument('--fragment-cache-size', type=int, default=DEFAULT_FRAGMENT_CACHE_SIZE // (1024 * 1024),
+                        metavar='MB', help='size cap for the rendered content cache (default: %(default)s)')
+    parser.add_argument('--prune-cache', action='store_true',
+                        help='trim the rendered content cache to --fragment-cache-size and exit')
+    parser.add_argument('--import-cache', metavar='ARCHIVE',
+                        help='restore the build caches from an archive written by --export-cache, if it exists')
+    parser.add_argument('--export-cache', metavar='ARCHIVE',
+                        help='pack the build caches into a versioned archive after the build, e.g. for CI')
+    parser.add_argument('--precompress', action='store_true',
+                        help='write .gz (and .br if brotli is installed) copies of pages and text assets')
+    parser.add_argument('--deploy-manifest', default=DEFAULT_DEPLOY_MANIFEST_PATH, metavar='PATH',
+                        help='where to list the outputs added, modified or deleted since the previous build'
+                             f' (default: {DEFAULT_DEPLOY_MANIFEST_PATH})')
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH,
+                        help=f'where to write the JSON build report (default: {DEFAULT_REPORT_PATH})')
+    parser.add_argument('--top', type=int, default=5, help='number of slowest pages to list (default: 5)')
+    parser.add_argument('--watch', action='store_true',
+                        help='serve public/ with live reload and rebuild affected pages on change')
+    parser.add_argument('--port', type=int, default=8888, help='dev server port for --watch (default: 8888)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.jobs is None:
+        jobs = 1
     else:
-        basepath = args[1]
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    set_inline_cache_size(args.inline_cache)
+    fragment_cache = FragmentCache() if args.fragment_cache or args.prune_cache else None
+    if args.prune_cache:
+        removed, kept = fragment_cache.prune(args.fragment_cache_size * 1024 * 1024)
+        print(f"Pruned {fragment_cache.path}: {removed} removed, {kept} bytes kept")
+        return
+
+    if args.import_cache:
+        if not Path(args.import_cache).exists():
+            print(f"No build cache at {args.import_cache}, building from scratch")
+        else:
+            try:
+                count = import_cache(args.import_cache)
+                print(f"Restored {count} cache file(s) from {args.import_cache}")
+            except CacheArchiveError as e:
+                print(f"Ignoring build cache {args.import_cache}: {e}")
+    manifest = BuildManifest.load()
+    report = BuildReport(args.basepath, jobs)
+    start = time.perf_counter()
+    assets = None
+    if args.fingerprint:
+        assets = fingerprint_assets('static', manifest)
+        Path('public').mkdir(parents=True, exist_ok=True)
+        write_asset_manifest(assets, 'public')
+    copied, unchanged, removed = sync_public_directory('static', 'public', manifest, assets)
+    report.add_section('sync', time.perf_counter() - start, copied=copied, unchanged=unchanged, removed=removed)
+    images = None
+    image_sizes = None
+    if args.image_sizes:
+        start = time.perf_counter()
+        images = ImageIndex.load()
+        image_sizes = images.scan('static', manifest)
+        images.save()
+        report.add_section('images', time.perf_counter() - start, images=len(image_sizes))
+    posts = PostIndex.load() if args.blog_page_size > 0 else None
+    try:
+        generate_pages_recursive('content', 'template.html', 'public', args.basepath, manifest, jobs,
+                                 report, args.quiet, args.image_prefix, assets, image_sizes, fragment_cache,
+                                 args.drafts)
+        resolver = URLResolver(args.basepath, args.image_prefix, assets, image_sizes)
+        if posts is not None:
+            start = time.perf_counter()
+            generated, unchanged = build_blog_index('content', 'template.html', 'public', resolver, manifest, posts,
+                                                    args.blog_page_size, args.drafts, args.quiet)
+            report.add_section('blog', time.perf_counter() - start, posts=len(posts.entries),
+                               generated=generated, unchanged=unchanged)
+        if args.site_url:
+            start = time.perf_counter()
+            written, unchanged = write_site_files('public', manifest, resolver, args.site_url, args.quiet)
+            report.add_section('sitemap', time.perf_counter() - start, written=written, unchanged=unchanged)
+        for output in manifest.remove_stale('public'):
+            print(f"Removed stale page: {output}")
+        start = time.perf_counter()
+        links = LinkIndex.from_manifest(manifest, 'public')
+        broken = links.check(URLResolver(args.basepath, args.image_prefix, assets))
+        for link in broken:
+            print(link)
+        report.add_section('links', time.perf_counter() - start, checked=links.link_count, broken=len(broken))
+        if fragment_cache is not None:
+            start = time.perf_counter()
+            removed, kept = fragment_cache.prune(args.fragment_cache_size * 1024 * 1024)
+            report.add_section('fragments', time.perf_counter() - start, removed=removed, kept_bytes=kept)
+        if broken and args.strict_links and not args.watch:
+            raise BrokenLinksError(broken)
+        if args.precompress:
+            start = time.perf_counter()
+            # Without -j compression picks its own thread count
+            compressed, unchanged, removed = precompress_tree('public', jobs if args.jobs is not None else None)
+            print(f"Precompressed public: {compressed} compressed, {unchanged} unchanged, {removed} removed")
+            report.add_section('precompress', time.perf_counter() - start,
+                               compressed=compressed, unchanged=unchanged, removed=removed)
+        start = time.perf_counter()
+        delta = update_deploy_manifest('public', manifest, args.deploy_manifest)
+        print(f"Deploy delta: {len(delta['added'])} added, {len(delta['modified'])} modified, "
+              f"{len(delta['deleted'])} deleted, {delta['unchanged']} unchanged -> {args.deploy_manifest}")
+        report.add_section('deploy', time.perf_counter() - start, added=len(delta['added']),
+                           modified=len(delta['modified']), deleted=len(delta['deleted']),
+                           unchanged=delta['unchanged'])
+    except PageBuildError as e:
+        if not args.watch:
+            raise
+        # Keep serving so the broken pages can be fixed with live reload
+        print(e)
+    finally:
+        # Keep the record of pages that did build even if others failed
+        manifest.save()
+        report.finish()
+        report.write(args.report)
+        print(report.summary(args.top))
+
+    if args.export_cache:
+        count = export_cache(args.export_cache)
+        print(f"Exported {count} cache file(s) to {args.export_cache}")
+
+    if args.watch:
+        from devserver import watch_and_serve
+        watch_and_serve(
+            ['content', 'static', template_pattern('template.html')],
+            lambda changed: rebuild_changed(changed, args.basepath, manifest, image_prefix=args.image_prefix,
+                                            assets=assets, images=images, fragment_cache=fragment_cache,
+                                            drafts=args.drafts, posts=posts, blog_page_size=args.blog_page_size,
+                                            site_url=args.site_url, quiet=args.quiet),
+            'public', args.port,
+        )
+
+if __name__ == '__main__':
     main()
\ No newline at end of file
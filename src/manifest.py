@@ -0,0 +1,208 @@
+import hashlib, json
+from datetime import datetime, timezone
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_PATH = '.build-cache/manifest.json'
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text):
+    return hash_bytes(text.encode('utf-8'))
+
+def hash_file(path, chunk_size=1 << 16):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_json(path):
+    """The JSON value stored at `path`, or None when it is missing or unreadable."""
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def save_json(path, data, sort_keys=True):
+    """Write `data` as JSON to a temporary file, then replace `path` with it."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file, indent=1, sort_keys=sort_keys)
+    tmp_path.replace(path)
+
+def remove_empty_parents(path, root):
+    """Remove the directories above `path` that are left empty, up to but not including `root`."""
+    root = Path(root)
+    parent = Path(path).parent
+    while parent != root and parent.is_relative_to(root) and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+
+class ContentIndex:
+    """Values read from files, keyed by content hash and kept between builds.
+
+    `lookup` only reads a file whose hash is not in the index; with the
+    build manifest's stat cache an unchanged file costs one stat call.
+    After a pass over the tree, `forget_unused` drops the entries of files
+    that are gone.
+    """
+    def __init__(self, path, entries=None):
+        self.path = Path(path)
+        self.entries = entries if entries is not None else {}
+        self._used = {}
+
+    @classmethod
+    def load(cls, path):
+        entries = load_json(path)
+        return cls(path, entries if isinstance(entries, dict) else None)
+
+    def save(self):
+        save_json(self.path, self.entries)
+
+    def lookup(self, path, read, manifest=None):
+        """The value for the file at `path`, from `read(path)` when its content is new."""
+        digest = manifest.file_hash(path) if manifest is not None else hash_file(path)
+        if digest not in self.entries:
+            self.entries[digest] = read(path)
+        self._used[digest] = self.entries[digest]
+        return self._used[digest]
+
+    def forget_unused(self):
+        self.entries = self._used
+        self._used = {}
+
+class BuildManifest:
+    """Persistent record of the inputs that produced each output file.
+
+    `files` caches content hashes by path together with size/mtime so an
+    untouched file is never re-read; `outputs` maps each generated page to
+    the hashes of the source, template and URL settings it was built from.
+    `assets` lists the static files copied into the destination so a sync
+    can tell orphaned assets apart from generated pages. `links` keeps the
+    markdown link and image URLs of each page so unchanged pages can still
+    be link-checked, `output_hashes` the hash and size of each page as last
+    written, with the time that content first appeared, and `page_meta` the
+    title, date and tags of each page for the sitemap and feed. `output_tree` is the hash and size of every file in the
+    destination after the last build, for the deploy delta.
+    """
+    def __init__(self, path=DEFAULT_MANIFEST_PATH, files=None, outputs=None, assets=None, links=None,
+                 output_hashes=None, output_tree=None, page_meta=None):
+        self.path = Path(path)
+        self.files = files if files is not None else {}
+        self.outputs = outputs if outputs is not None else {}
+        self.assets = assets if assets is not None else []
+        self.links = links if links is not None else {}
+        self.output_hashes = output_hashes if output_hashes is not None else {}
+        self.output_tree = output_tree if output_tree is not None else {}
+        self.page_meta = page_meta if page_meta is not None else {}
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path=DEFAULT_MANIFEST_PATH):
+        path = Path(path)
+        data = load_json(path)
+        if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get('files', {}), data.get('outputs', {}), data.get('assets', []),
+                   data.get('links', {}), data.get('output_hashes', {}),
+                   data.get('output_tree', {}), data.get('page_meta', {}))
+
+    def save(self):
+        save_json(self.path, {
+            'version': MANIFEST_VERSION,
+            'files': self.files,
+            'outputs': self.outputs,
+            'assets': self.assets,
+            'links': self.links,
+            'output_hashes': self.output_hashes,
+            'output_tree': self.output_tree,
+            'page_meta': self.page_meta,
+        })
+
+    def file_hash(self, path):
+        key = str(path)
+        stat = Path(path).stat()
+        entry = self.files.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['hash']
+        digest = hash_file(path)
+        self.files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+        return digest
+
+    def page_inputs(self, source_path, template_path, urls, renderer_version):
+        # `urls` is template.page_url_key: the shared URL settings plus the fingerprints and image
+        # sizes of the URLs the page uses; `renderer_version` is mdhandler.RENDERER_VERSION, so a
+        # renderer change rebuilds every page
+        return {
+            'source': str(source_path),
+            'source_hash': self.file_hash(source_path),
+            'template_hash': self.file_hash(template_path),
+            'urls_hash': hash_text(urls),
+            'renderer_version': renderer_version,
+        }
+
+    def is_fresh(self, output_path, inputs):
+        key = str(output_path)
+        self.seen.add(key)
+        return self.outputs.get(key) == inputs and Path(output_path).exists()
+
+    def record(self, output_path, inputs, links=None, output_hash=None, output_size=None, meta=None):
+        key = str(output_path)
+        self.seen.add(key)
+        self.outputs[key] = inputs
+        if links is not None:
+            self.links[key] = [list(link) for link in links]
+        if meta is not None:
+            self.page_meta[key] = meta
+        if output_hash is not None:
+            previous = self.output_hashes.get(key)
+            if previous and previous['hash'] == output_hash and 'modified' in previous:
+                modified = previous['modified']
+            else:
+                modified = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self.output_hashes[key] = {'hash': output_hash, 'size': output_size, 'modified': modified}
+            # The page was just written or compared, so seed the stat cache
+            stat = Path(output_path).stat()
+            self.files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': output_hash}
+
+    def remove_stale(self, dest_dir=None):
+        """Delete outputs whose source no longer exists and return their paths."""
+        removed = sorted(set(self.outputs) - self.seen)
+        for key in removed:
+            self.remove_output(key, dest_dir)
+        return removed
+
+    def remove_output(self, output_path, dest_dir=None):
+        """Forget a single output and delete it, e.g. when its source was removed.
+
+        With `dest_dir`, directories the output leaves empty are removed too.
+        """
+        entry = self.outputs.pop(str(output_path), None)
+        self.links.pop(str(output_path), None)
+        self.output_hashes.pop(str(output_path), None)
+        self.page_meta.pop(str(output_path), None)
+        if entry and entry.get('source'):
+            self.files.pop(entry['source'], None)
+        output = Path(output_path)
+        if output.exists():
+            output.unlink()
+            if dest_dir is not None:
+                remove_empty_parents(output, dest_dir)
+
+    def replace_output_tree(self, tree):
+        """Store the snapshot of the destination and return the previous one."""
+        previous = self.output_tree
+        self.output_tree = tree
+        return previous
+
+    def replace_assets(self, synced):
+        """Store the synced asset paths and return the previously synced ones that are gone."""
+        synced = {str(path) for path in synced}
+        stale = sorted(set(self.assets) - synced)
+        self.assets = sorted(synced)
+        return stale
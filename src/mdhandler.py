@@ -1,7 +1,15 @@
-import re
+import mmap, os, re, time
+from collections import OrderedDict
+from contextlib import contextmanager
 from enum import Enum
 from textnode import TextNode, TextType, text_node_to_html_node
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from template import load_template
+from urlresolver import URLResolver
+from outputwriter import write_chunks_if_changed, write_if_changed
+from manifest import hash_bytes, hash_file
+from frontmatter import page_template, read_front_matter, split_front_matter, template_values
+from buildreport import PageStats
 
 class BlockType(Enum):
     PARAGRAPH = 'p'
@@ -100,15 +108,81 @@ def split_nodes_link(old_nodes):
 
 #     return new_nodes
 
+# Inline delimiters in the order the old split passes applied them; a lower
+# level wins over a higher one, so e.g. `*` inside `**bold**` is plain text
+INLINE_DELIMITERS = {
+    '**': (0, TextType.BOLD),
+    '*': (1, TextType.ITALIC),
+    '_': (2, TextType.ITALIC),
+    '`': (3, TextType.CODE),
+}
+INLINE_DELIMITER_RE = re.compile(r'\*\*|[*_`]')
+
+def _bracket_spans(text, start, end, marker):
+    # Yields (start, end, label, url) for each marker[label](url) in
+    # text[start:end], matching exactly what the lazy r'\[(.+?)\]\((.+?)\)'
+    # would: label and url are non-empty and never span a newline. A failed
+    # candidate means no later one on the same line can match, so each line
+    # is scanned a bounded number of times instead of backtracking.
+    position = start
+    while True:
+        candidate = text.find(marker, position, end)
+        if candidate == -1:
+            return
+        line_end = text.find('\n', candidate, end)
+        if line_end == -1:
+            line_end = end
+        label_end = text.find('](', candidate + len(marker) + 1, line_end)
+        url_end = text.find(')', label_end + 3, line_end) if label_end != -1 else -1
+        if url_end == -1:
+            if line_end == end:
+                return
+            position = line_end + 1
+            continue
+        yield candidate, url_end + 1, text[candidate + len(marker):label_end], text[label_end + 2:url_end]
+        position = url_end + 1
+
+def _delimited_nodes(text, start, end, nodes):
+    open_level = None
+    open_type = None
+    position = start
+    for match in INLINE_DELIMITER_RE.finditer(text, start, end):
+        level, text_type = INLINE_DELIMITERS[match.group()]
+        if open_level is None:
+            if match.start() > position:
+                nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            open_level, open_type = level, text_type
+            position = match.end()
+        elif level == open_level:
+            nodes.append(TextNode(text[position:match.start()], open_type))
+            open_level = None
+            position = match.end()
+        elif level < open_level:
+            raise ValueError(f"Invalid markdown, formatted section not closed")
+    if open_level is not None:
+        raise ValueError(f"Invalid markdown, formatted section not closed")
+    if end > position:
+        nodes.append(TextNode(text[position:end], TextType.TEXT))
+
+def _link_nodes(text, start, end, nodes):
+    position = start
+    for link_start, link_end, label, url in _bracket_spans(text, start, end, '['):
+        _delimited_nodes(text, position, link_start, nodes)
+        nodes.append(TextNode(label, TextType.LINK, url))
+        position = link_end
+    _delimited_nodes(text, position, end, nodes)
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, '**', TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, '*', TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, '_', TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, '`', TextType.CODE)
-    # nodes = split_nodes_break(nodes)
+    # Single left-to-right scan producing the same nodes as running
+    # split_nodes_image, split_nodes_link and split_nodes_delimiter for
+    # '**', '*', '_' and '`' in turn, without the intermediate node lists
+    nodes = []
+    position = 0
+    for image_start, image_end, alt, url in _bracket_spans(text, 0, len(text), '!['):
+        _link_nodes(text, position, image_start, nodes)
+        nodes.append(TextNode(alt, TextType.IMAGE, url))
+        position = image_end
+    _link_nodes(text, position, len(text), nodes)
     return nodes
     
 def markdown_to_blocks(markdown):
@@ -120,50 +194,193 @@ def markdown_to_blocks(markdown):
     #breakpoint()
     return blocks
 
-def block_to_block_type(block):
-    lines = block.split("\n")
-    #breakpoint()
-    if re.match(r'^#{1}\s', block):
-        return BlockType.HEADING_1
-    if re.match(r'^#{2}\s', block):
-        return BlockType.HEADING_2
-    if re.match(r'^#{3}\s', block):
-        return BlockType.HEADING_3
-    if re.match(r'^#{4}\s', block):
-        return BlockType.HEADING_4
-    if re.match(r'^#{5}\s', block):
-        return BlockType.HEADING_5
-    if re.match(r'^#{6}\s', block):
-        return BlockType.HEADING_6
-    if re.match(r'\A`{3}', block) and re.search(r'`{3}\Z', block):
+def _finish_block(raw):
+    # Same filtering as markdown_to_blocks: skip empty pieces, strip the rest
+    if raw:
+        yield raw.strip()
+
+def iter_blocks(chunks):
+    """Yield the blocks markdown_to_blocks would return, from text chunks.
+
+    `chunks` is any iterable of strings, typically a file's lines. The
+    '\\n\\n' separators are paired left to right exactly like str.split, also
+    across chunk boundaries, and only the current block is kept in memory.
+    """
+    pending = []
+    for chunk in chunks:
+        if pending and pending[-1].endswith('\n') and chunk.startswith('\n'):
+            pending[-1] = pending[-1][:-1]
+            yield from _finish_block(''.join(pending))
+            pending = []
+            chunk = chunk[1:]
+        pieces = chunk.split('\n\n')
+        if len(pieces) == 1:
+            if chunk:
+                pending.append(chunk)
+            continue
+        pending.append(pieces[0])
+        yield from _finish_block(''.join(pending))
+        for piece in pieces[1:-1]:
+            yield from _finish_block(piece)
+        pending = [pieces[-1]] if pieces[-1] else []
+    yield from _finish_block(''.join(pending))
+
+def _iter_mmap_blocks(data, start=0):
+    while True:
+        end = data.find(b'\n\n', start)
+        if end == -1:
+            yield from _finish_block(data[start:].decode('utf-8'))
+            return
+        yield from _finish_block(data[start:end].decode('utf-8'))
+        start = end + 2
+
+def iter_markdown_blocks(path, use_mmap=False, start=0):
+    """Lazily yield the blocks of a markdown file from byte offset `start`.
+
+    Reads line by line, or with `use_mmap` searches the mapped file for
+    separators directly. Files with '\\r' line endings always use the line
+    reader so newline translation matches read_file. `start` skips front
+    matter and must fall on a line boundary.
+    """
+    if use_mmap:
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b'\r') == -1:
+                    yield from _iter_mmap_blocks(data, start)
+                    return
+    with open(path, 'r') as file:
+        file.seek(start)
+        yield from iter_blocks(file)
+
+HEADINGS_BY_LEVEL = [None, BlockType.HEADING_1, BlockType.HEADING_2, BlockType.HEADING_3,
+                     BlockType.HEADING_4, BlockType.HEADING_5, BlockType.HEADING_6]
+
+def _classify_heading(block):
+    # 1-6 '#' followed by whitespace; longer runs are plain paragraphs
+    level = len(block) - len(block.lstrip('#'))
+    if level <= 6 and level < len(block) and block[level].isspace():
+        return HEADINGS_BY_LEVEL[level]
+    return BlockType.PARAGRAPH
+
+def _classify_code(block):
+    if block.startswith('```') and block.endswith('```'):
         return BlockType.CODE
-    if re.match(r'^>', block):
-        for line in lines:
-            if not line.startswith(">"):
-                return BlockType.PARAGRAPH
+    return BlockType.PARAGRAPH
+
+def _classify_quote(block):
+    # Every line starts with '>' when every newline is followed by one
+    if block.count('\n') == block.count('\n>'):
         return BlockType.QUOTE
-    if re.match(r'^-\s', block):
-        for line in lines:
-            if not line.startswith("- "):
-                return BlockType.PARAGRAPH
+    return BlockType.PARAGRAPH
+
+def _classify_unordered_list(block):
+    if block.startswith('- ') and block.count('\n') == block.count('\n- '):
         return BlockType.UNORDERED_LIST
-    if re.match(r'^1\.\s', block):
-        i = 1
-        for line in lines:
-            if not line.startswith(f"{i}. "):
-                return BlockType.PARAGRAPH
-            i += 1
-        return BlockType.ORDERED_LIST
-    
     return BlockType.PARAGRAPH
 
+def _classify_ordered_list(block):
+    for i, line in enumerate(block.split('\n'), 1):
+        if not line.startswith(f"{i}. "):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+# The first character decides which check can apply at all
+BLOCK_CLASSIFIERS = {
+    '#': _classify_heading,
+    '`': _classify_code,
+    '>': _classify_quote,
+    '-': _classify_unordered_list,
+    '1': _classify_ordered_list,
+}
+
+def block_to_block_type(block):
+    classify = BLOCK_CLASSIFIERS.get(block[:1])
+    if classify is None:
+        return BlockType.PARAGRAPH
+    return classify(block)
+
+LINK_KINDS = {TextType.LINK: 'link', TextType.IMAGE: 'image'}
+
+# While recording_links() is active, the (kind, url) of every rendered link
+# and image; kept per process like INLINE_CACHE
+_recorded_links = None
+
+@contextmanager
+def recording_links():
+    """Collect the markdown URL of every link and image rendered in the block."""
+    global _recorded_links
+    previous = _recorded_links
+    _recorded_links = links = []
+    try:
+        yield links
+    finally:
+        _recorded_links = previous
+
+def _link_targets(text_nodes):
+    return tuple((LINK_KINDS[node.text_type], node.url) for node in text_nodes if node.text_type in LINK_KINDS)
+
+class InlineCache:
+    """A bounded LRU map from one line of inline markdown to its rendered HTML.
+
+    Footers, navigation lists and boilerplate lines repeat across pages, so
+    the paragraph, list and quote converters look each line up here before
+    tokenizing it. `hits` and `misses` count lookups; maxsize 0 disables it.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, maxsize):
+        # A negative size disables the cache like 0
+        self.maxsize = max(0, maxsize)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, line, resolver=None):
+        key = (line, resolver)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            text_nodes = text_to_textnodes(line)
+            html = ''.join(text_node_to_html_node(node, resolver).to_html() for node in text_nodes)
+            # Links are kept with the fragment so cache hits still record them
+            entry = (html, _link_targets(text_nodes))
+            if self.maxsize > 0:
+                self.entries[key] = entry
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        if _recorded_links is not None:
+            _recorded_links.extend(entry[1])
+        return entry[0]
+
+    def node(self, line, resolver=None):
+        # The cached fragment as a raw text leaf, ready to append to a block
+        return LeafNode(value=self.render(line, resolver))
+
+INLINE_CACHE = InlineCache()
+
+def set_inline_cache_size(maxsize):
+    INLINE_CACHE.resize(maxsize)
+
 def code_block_to_html_node(block):
     code_content = re.sub(r'^```.*?\n', '', block)  
     code_content = re.sub(r'(\n)```$', r'\1', code_content)  
     code_node = TextNode(code_content, TextType.CODE)
     return ParentNode('pre',[text_node_to_html_node(code_node)])
 
-def quote_block_to_html_node(block):
+def quote_block_to_html_node(block, resolver=None):
     # Split into lines and process each line
     lines = block.split('\n')
     html_nodes = []
@@ -177,9 +394,7 @@ def quote_block_to_html_node(block):
             continue
             
         # Process line for inline markdown
-        text_nodes = text_to_textnodes(cleaned_line)
-        for node in text_nodes:
-            html_nodes.append(text_node_to_html_node(node))
+        html_nodes.append(INLINE_CACHE.node(cleaned_line, resolver))
         
         # Add <br> between non-empty lines (but not after the last line)
         if i < len(lines) - 1:
@@ -191,15 +406,13 @@ def quote_block_to_html_node(block):
     
     return ParentNode(BlockType.QUOTE.value, html_nodes)
 
-def paragraph_to_html_node(block):
+def paragraph_to_html_node(block, resolver=None):
     lines = block.split('\n')
     html_nodes = []
     
     for i, line in enumerate(lines):
         if line.strip():  
-            text_nodes = text_to_textnodes(line)
-            for node in text_nodes:
-                html_nodes.append(text_node_to_html_node(node))
+            html_nodes.append(INLINE_CACHE.node(line, resolver))
         
 
         if i < len(lines) - 1 and line.strip():
@@ -207,44 +420,34 @@ def paragraph_to_html_node(block):
     
     return ParentNode(BlockType.PARAGRAPH.value, html_nodes)
 
-def unordered_list_to_html_node(block):
+def unordered_list_to_html_node(block, resolver=None):
     lines = re.findall(r'^- (.+)$', block, re.MULTILINE)
     html_nodes = []
     for line in lines:
         # Process each list item for inline markdown formatting
-        text_nodes = text_to_textnodes(line)
-        li_children = []
-        for node in text_nodes:
-            li_children.append(text_node_to_html_node(node))
-        
-        # Create the <li> as a ParentNode to hold the processed content
-        html_nodes.append(ParentNode('li', li_children))
+        html_nodes.append(ParentNode('li', [INLINE_CACHE.node(line, resolver)]))
     
     return ParentNode(BlockType.UNORDERED_LIST.value, html_nodes)
 
-def ordered_list_to_html_node(block):
+def ordered_list_to_html_node(block, resolver=None):
     lines = re.findall(r'^\d\. (.+)$', block, re.MULTILINE)
     html_nodes = []
     for line in lines:
         # Process each list item for inline markdown formatting
-        text_nodes = text_to_textnodes(line)
-        li_children = []
-        for node in text_nodes:
-            li_children.append(text_node_to_html_node(node))
-        
-        # Create the <li> as a ParentNode to hold the processed content
-        html_nodes.append(ParentNode('li', li_children))
+        html_nodes.append(ParentNode('li', [INLINE_CACHE.node(line, resolver)]))
     
     return ParentNode(BlockType.ORDERED_LIST.value, html_nodes)
 
-def headings_to_html_node(block):
+def headings_to_html_node(block, resolver=None):
     lines = re.findall(r'^(#+)\s(.+)$', block, re.MULTILINE)
     html_nodes = []
     for h, value in lines:
         text_nodes = text_to_textnodes(value)
+        if _recorded_links is not None:
+            _recorded_links.extend(_link_targets(text_nodes))
         sub_nodes = []
         for node in text_nodes:
-            sub_nodes.append(text_node_to_html_node(node))
+            sub_nodes.append(text_node_to_html_node(node, resolver))
         if len(sub_nodes) > 1:
             html_nodes.append(ParentNode(f'h{len(h)}', sub_nodes))
         elif len(sub_nodes) == 1 and text_nodes[0].text_type != 'TEXT':
@@ -257,39 +460,51 @@ def headings_to_html_node(block):
 
 
 
-def markdown_to_html_node(markdown):
-    HEADING_TYPES = {BlockType.HEADING_1, BlockType.HEADING_2, BlockType.HEADING_3, 
+HEADING_TYPES = {BlockType.HEADING_1, BlockType.HEADING_2, BlockType.HEADING_3, 
                  BlockType.HEADING_4, BlockType.HEADING_5, BlockType.HEADING_6}
+
+def block_to_html_nodes(block, block_type=None, resolver=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    if block_type == BlockType.CODE:
+        return [code_block_to_html_node(block)]
+    elif block_type == BlockType.QUOTE:
+        return [quote_block_to_html_node(block, resolver)]
+    elif block_type == BlockType.UNORDERED_LIST:
+        return [unordered_list_to_html_node(block, resolver)]
+    elif block_type == BlockType.ORDERED_LIST:
+        return [ordered_list_to_html_node(block, resolver)]
+    elif block_type in HEADING_TYPES:
+        return headings_to_html_node(block, resolver)
+    else:
+        if block_type == BlockType.PARAGRAPH:
+            return [paragraph_to_html_node(block, resolver)]
+        else:
+            text_nodes = text_to_textnodes(block)
+            if _recorded_links is not None:
+                _recorded_links.extend(_link_targets(text_nodes))
+            html_nodes = []
+            for node in text_nodes:
+                html_nodes.append(text_node_to_html_node(node, resolver))
+            return [ParentNode(block_type.value, html_nodes)]
+
+def markdown_to_html_node(markdown, resolver=None):
     blocks = markdown_to_blocks(markdown)
     child_nodes=[]
     for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.CODE:
-            node = code_block_to_html_node(block)
-            child_nodes.append(node)
-        elif block_type == BlockType.QUOTE:
-            child_nodes.append(quote_block_to_html_node(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            child_nodes.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            child_nodes.append(ordered_list_to_html_node(block))
-        elif block_type in HEADING_TYPES:
-            child_nodes.extend(headings_to_html_node(block))
-        else:
-            if block_type == BlockType.PARAGRAPH:
-                child_nodes.append(paragraph_to_html_node(block))
-            else:
-                text_nodes = text_to_textnodes(block)
-                html_nodes = []
-                for node in text_nodes:
-                    html_nodes.append(text_node_to_html_node(node))
-                child_nodes.append(ParentNode(block_type.value, html_nodes))
-        
+        child_nodes.extend(block_to_html_nodes(block, resolver=resolver))
 
     return ParentNode('div', child_nodes)
+
+def iter_markdown_html(blocks, resolver=None):
+    """Yield the HTML of markdown_to_html_node(...).to_html() one block at a time."""
+    yield '<div>'
+    for block in blocks:
+        for node in block_to_html_nodes(block, resolver=resolver):
+            yield from node.iter_html()
+    yield '</div>'
     
-def extract_title(markdown):
-    blocks = markdown_to_blocks(markdown)
+def extract_title_from_blocks(blocks):
     title = ''
     for block in blocks:
         if re.match(r'^(#+)\s(.+)$', block):
@@ -300,19 +515,123 @@ def extract_title(markdown):
     else:
         raise Exception('no title in markdown or title in incorrect format')
 
+def extract_title(markdown):
+    return extract_title_from_blocks(markdown_to_blocks(markdown))
+
 def read_file(path):
     with open(path, 'r') as file:
         return file.read()
     
-def generate_page(from_path, template_path, dest_path, basepath='/'):
-    print(f'Generating page from {from_path} to {dest_path} using {template_path}')
-    markdown = read_file(from_path)
-    template = read_file(template_path)
-    html_node = markdown_to_html_node(markdown)
-    html_string = html_node.to_html()
-    html = template.replace('{{ Title }}', extract_title(markdown))
-    html = html.replace('{{ Content }}', html_string)
-    html = html.replace('href="/', f'href="{basepath}' )
-    html = html.replace('src="/', f'src="{basepath}' )
-    with open(dest_path, 'w') as html_file:
-        html_file.write(html)
+# Sources at least this large are rendered block by block from disk
+STREAMING_THRESHOLD = 4 * 1024 * 1024
+# Bump whenever the same markdown starts rendering to different HTML, so
+# cached fragments from older builds are not reused
+RENDERER_VERSION = 2
+
+def generate_page(from_path, template_path, dest_path, basepath='/', metadata=None, stats=None, verbose=True,
+                  resolver=None, fragment_cache=None, writer=None):
+    """Render one markdown file into dest_path, recording stage timings in `stats`.
+
+    Root-relative link and image URLs are resolved for `basepath` (or by
+    `resolver` when given) as the nodes are built, so the rendered page is
+    never rescanned. With a `fragment_cache` the rendered content is reused
+    when the markdown and URL settings are unchanged.
+
+    Front matter at the top of the file supplies the title, other template
+    values and a per-page template (see frontmatter.py); without a title
+    there, the first heading is used.
+
+    An existing output with identical content is left untouched; otherwise
+    it is replaced atomically. With a `writer` (outputwriter.OutputWriter)
+    the write happens in the background and `stats.output_unchanged` stays
+    None until the caller reads the writer's results.
+    """
+    if verbose:
+        print(f'Generating page from {from_path} to {dest_path} using {template_path}')
+    if stats is None:
+        stats = PageStats(from_path, dest_path)
+    if resolver is None:
+        resolver = URLResolver(basepath)
+    stats.input_bytes = os.path.getsize(from_path)
+    hits_before, misses_before = INLINE_CACHE.hits, INLINE_CACHE.misses
+    streaming = stats.input_bytes >= STREAMING_THRESHOLD
+    if streaming:
+        # The front matter and the title come from scans that stop early;
+        # reading and parsing the body happen lazily and count as render
+        with stats.time('read'):
+            meta, body_start = read_front_matter(from_path)
+            title = meta.get('title') or extract_title_from_blocks(iter_markdown_blocks(from_path, start=body_start))
+        content = iter_markdown_html(iter_markdown_blocks(from_path, use_mmap=True, start=body_start), resolver)
+    else:
+        with stats.time('read'):
+            text = read_file(from_path)
+            meta, markdown = split_front_matter(text, from_path)
+        cached = None
+        if fragment_cache is not None:
+            with stats.time('read'):
+                cache_key = fragment_cache.key(text, RENDERER_VERSION, resolver.key)
+                cached = fragment_cache.get(cache_key)
+            # The key leaves out the asset map; a fragment is stale only when
+            # the fingerprinted names of its own links changed
+            if cached is not None and cached.get('urls') != resolver.links_key(cached['links']):
+                cached = None
+        if cached is not None:
+            stats.fragment_hit = True
+            title = cached['title']
+            content = [cached['html']]
+            links = [tuple(link) for link in cached['links']]
+        else:
+            with recording_links() as links:
+                with stats.time('split'):
+                    blocks = markdown_to_blocks(markdown)
+                child_nodes = []
+                for block in blocks:
+                    with stats.time('classify'):
+                        block_type = block_to_block_type(block)
+                    with stats.time('parse'):
+                        child_nodes.extend(block_to_html_nodes(block, block_type, resolver))
+            with stats.time('parse'):
+                # Without a front matter title, the first heading of the blocks just parsed
+                title = meta.get('title') or extract_title_from_blocks(blocks)
+            content = ParentNode('div', child_nodes).iter_html()
+            if fragment_cache is not None:
+                with stats.time('render'):
+                    content = [''.join(content)]
+                fragment_cache.put(cache_key, title, content[0], links, resolver.links_key(links))
+        if _recorded_links is not None:
+            _recorded_links.extend(links)
+    with stats.time('template'):
+        template = load_template(page_template(meta, template_path), resolver=resolver)
+    stats.page_meta = {'title': title, 'date': meta.get('date'), 'tags': meta.get('tags', [])}
+    values = dict(metadata or {})
+    values.update(template_values(meta))
+    values['Title'] = title
+    values['Content'] = stats.timed_chunks(content, 'render')
+
+    # Rendering, template filling and writing are interleaved while the page
+    # is produced; split the elapsed time back into the three stages. A page
+    # that fails to render never replaces the existing output.
+    rendered_before = stats.stages['render']
+    filled_before = stats.stages['template']
+    start = time.perf_counter()
+    chunks = stats.timed_chunks(template.iter_render(values), 'template')
+    if streaming:
+        stats.output_unchanged = write_chunks_if_changed(dest_path, chunks)
+        stats.output_bytes = os.path.getsize(dest_path)
+        stats.output_hash = hash_file(dest_path)
+    else:
+        data = ''.join(chunks).encode('utf-8')
+        stats.output_bytes = len(data)
+        stats.output_hash = hash_bytes(data)
+        if writer is None:
+            stats.output_unchanged = write_if_changed(dest_path, data, stats.output_hash)
+        else:
+            writer.submit(dest_path, data, stats.output_hash)
+    elapsed = time.perf_counter() - start
+    rendered = stats.stages['render'] - rendered_before
+    filled = stats.stages['template'] - filled_before
+    stats.stages['template'] -= rendered
+    stats.add('write', elapsed - filled)
+    stats.inline_hits = INLINE_CACHE.hits - hits_before
+    stats.inline_misses = INLINE_CACHE.misses - misses_before
+    return stats
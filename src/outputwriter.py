@@ -0,0 +1,96 @@
+import hashlib, os, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file
+
+def _temp_path(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+def _same_content(path, size, digest):
+    try:
+        if os.path.getsize(path) != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == digest
+
+def write_if_changed(path, data, digest=None):
+    """Write `data` (bytes) to `path` atomically unless the file already holds it.
+
+    The existing file is compared by size first and by hash only when the
+    sizes match. Changed content goes to a temp file in the same directory
+    that is then renamed over `path`, so readers never see a partial file.
+    `digest` is the sha256 hex digest of `data` if the caller already has it.
+    Returns True when the file was left untouched.
+    """
+    if digest is None:
+        digest = hashlib.sha256(data).hexdigest()
+    if _same_content(path, len(data), digest):
+        return True
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return False
+
+def write_chunks_if_changed(path, chunks):
+    """Like write_if_changed for text produced piece by piece, e.g. a streamed page.
+
+    The chunks are written to a temp file first, so memory stays bounded;
+    the temp file replaces `path` only if its content differs.
+    """
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.writelines(chunks)
+        if _same_content(path, os.path.getsize(tmp_path), hash_file(tmp_path)):
+            os.remove(tmp_path)
+            return True
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return False
+
+class OutputWriter:
+    """Runs write_if_changed on a background thread pool.
+
+    `submit` returns at once so the next page can render while this one is
+    written. `close` waits for all writes and returns {path: exception} for
+    the ones that failed; `unchanged` and `written` hold the other paths.
+    """
+    def __init__(self, workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = {}
+        self.unchanged = set()
+        self.written = set()
+
+    def submit(self, path, data, digest=None):
+        self.futures[str(path)] = self.executor.submit(write_if_changed, path, data, digest)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        errors = {}
+        for path, future in self.futures.items():
+            error = future.exception()
+            if error is not None:
+                errors[path] = error
+            elif future.result():
+                self.unchanged.add(path)
+            else:
+                self.written.add(path)
+        self.futures = {}
+        return errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,83 @@
+import gzip, os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text types worth compressing; images are already compressed
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.xml', '.txt', '.map'}
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+def available_formats():
+    formats = {'.gz': _gzip}
+    if brotli is not None:
+        formats['.br'] = _brotli
+    return formats
+
+def _is_current(source_stat, compressed_path):
+    # Compressed copies carry their source's mtime, so one stat tells
+    # whether the source changed since they were written
+    try:
+        return os.stat(compressed_path).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def compress_file(path, formats=None):
+    """Write `path`.gz (and .br) next to `path` unless they are up to date.
+
+    Returns the number of compressed copies written.
+    """
+    formats = formats or available_formats()
+    source_stat = os.stat(path)
+    stale = [(suffix, compress) for suffix, compress in formats.items()
+             if not _is_current(source_stat, f'{path}{suffix}')]
+    if not stale:
+        return 0
+    with open(path, 'rb') as file:
+        data = file.read()
+    for suffix, compress in stale:
+        target = f'{path}{suffix}'
+        tmp = f'{target}.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(compress(data))
+        os.utime(tmp, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp, target)
+    return len(stale)
+
+def precompress_tree(root, jobs=None):
+    """Keep precompressed copies of every text file under `root` current.
+
+    Files are compressed on a thread pool (zlib and brotli release the GIL
+    while compressing). Copies whose source is gone are deleted. Returns
+    (compressed, unchanged, removed) counted in files.
+    """
+    root = Path(root)
+    formats = available_formats()
+    sources = []
+    orphans = []
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for name in filenames:
+            base, suffix = os.path.splitext(name)
+            if suffix in formats:
+                if base not in names and os.path.splitext(base)[1].lower() in COMPRESSIBLE_SUFFIXES:
+                    orphans.append(os.path.join(dirpath, name))
+            elif suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                sources.append(os.path.join(dirpath, name))
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        written = list(executor.map(lambda path: compress_file(path, formats), sources))
+    for orphan in orphans:
+        os.remove(orphan)
+
+    compressed = sum(1 for count in written if count)
+    return compressed, len(sources) - compressed, len(orphans)
@@ -0,0 +1,139 @@
+import json
+from datetime import timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+from blogindex import BLOG_DIR, BLOG_TITLE, page_url
+from frontmatter import parse_date
+from manifest import hash_text
+from outputwriter import write_chunks_if_changed
+
+SITEMAP_NAME = 'sitemap.xml'
+FEED_NAME = 'feed.xml'
+# The sitemaps.org limit per file; longer sitemaps are split under an index
+SITEMAP_URL_LIMIT = 50000
+FEED_ENTRIES = 20
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+def _moment(value):
+    # Naive front matter dates count as UTC
+    moment = parse_date(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+def _timestamp(value):
+    # RFC 3339, as Atom and sitemaps expect
+    return _moment(value).isoformat().replace('+00:00', 'Z')
+
+def _updated(page):
+    return page['date'] or page['modified']
+
+def site_pages(manifest, dest_dir):
+    """The pages generated by this build, with their metadata, sorted by URL.
+
+    Outputs the build did not see (deleted sources, drafts) are left out
+    even before remove_stale drops them from the manifest.
+    """
+    pages = []
+    for output, inputs in manifest.outputs.items():
+        if not output.endswith('.html') or output not in manifest.seen:
+            continue
+        meta = manifest.page_meta.get(output, {})
+        pages.append({
+            'url': page_url(output, dest_dir),
+            'source': inputs.get('source'),
+            'title': meta.get('title'),
+            'date': meta.get('date'),
+            'tags': meta.get('tags', []),
+            'modified': manifest.output_hashes.get(output, {}).get('modified'),
+        })
+    return sorted(pages, key=lambda page: page['url'])
+
+def iter_urlset(pages, absolute):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for page in pages:
+        yield f'<url><loc>{escape(absolute(page["url"]))}</loc>'
+        if _updated(page):
+            yield f'<lastmod>{_timestamp(_updated(page))}</lastmod>'
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+def iter_sitemap_index(urls):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for url in urls:
+        yield f'<sitemap><loc>{escape(url)}</loc></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+def iter_feed(posts, absolute, site_url):
+    feed_url = absolute(f'/{BLOG_DIR}/{FEED_NAME}')
+    updated = _timestamp(max(map(_updated, posts), key=_moment))
+    yield f'<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="{ATOM_NS}">\n'
+    yield f'<title>{escape(BLOG_TITLE)}</title>\n'
+    yield f'<id>{escape(absolute("/" + BLOG_DIR))}</id>\n'
+    yield f'<link rel="self" href={quoteattr(feed_url)}/>\n'
+    yield f'<link href={quoteattr(absolute("/" + BLOG_DIR))}/>\n'
+    yield f'<updated>{updated}</updated>\n'
+    yield f'<author><name>{escape(urlsplit(site_url).netloc)}</name></author>\n'
+    for post in posts:
+        url = absolute(post['url'])
+        yield f'<entry><title>{escape(post["title"] or post["url"])}</title>'
+        yield f'<link href={quoteattr(url)}/><id>{escape(url)}</id>'
+        yield f'<updated>{_timestamp(_updated(post))}</updated>'
+        for tag in post['tags']:
+            yield f'<category term={quoteattr(tag)}/>'
+        yield '</entry>\n'
+    yield '</feed>\n'
+
+def _write(path, chunks, inputs, manifest):
+    # Skips the XML entirely when its inputs match the last build
+    if manifest.is_fresh(path, inputs):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_chunks_if_changed(path, chunks)
+    manifest.record(path, inputs)
+    return True
+
+def write_site_files(dest_dir, manifest, resolver, site_url, quiet=False):
+    """Write sitemap.xml and blog/feed.xml from the pages recorded in the manifest.
+
+    URLs are `site_url` plus the page URL with the basepath applied. Both
+    files are streamed to disk, and each is rewritten only when the pages
+    or metadata it lists changed. Past SITEMAP_URL_LIMIT URLs the sitemap
+    becomes an index of sitemap-N.xml files. Returns (written, unchanged).
+    """
+    dest = Path(dest_dir)
+    site_url = site_url.rstrip('/')
+
+    def absolute(url):
+        return site_url + resolver.link(url)
+
+    pages = site_pages(manifest, dest)
+    files = []
+    chunks = [pages[start:start + SITEMAP_URL_LIMIT] for start in range(0, len(pages), SITEMAP_URL_LIMIT)]
+    if len(chunks) <= 1:
+        files.append((dest / SITEMAP_NAME, iter_urlset(pages, absolute), pages))
+    else:
+        urls = []
+        for number, chunk in enumerate(chunks, 1):
+            name = f'sitemap-{number}.xml'
+            files.append((dest / name, iter_urlset(chunk, absolute), chunk))
+            urls.append(absolute('/' + name))
+        files.append((dest / SITEMAP_NAME, iter_sitemap_index(urls), urls))
+    # Posts are the pages generated from content/blog/; the listing pages have no source
+    posts = [page for page in pages
+             if page['source'] and page['url'].startswith(f'/{BLOG_DIR}/') and _updated(page)]
+    posts = sorted(posts, key=lambda post: _moment(_updated(post)), reverse=True)[:FEED_ENTRIES]
+    if posts:
+        files.append((dest / BLOG_DIR / FEED_NAME, iter_feed(posts, absolute, site_url), posts))
+
+    written = 0
+    for path, xml, listed in files:
+        inputs = {'listing_hash': hash_text(json.dumps([site_url, resolver.key, listed], sort_keys=True))}
+        if _write(path, xml, inputs, manifest):
+            if not quiet:
+                print(f"Generating: {path}")
+            written += 1
+    return written, len(files) - written
@@ -0,0 +1,86 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from urlresolver import URLResolver
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+class Template:
+    """A page template pre-split into literal segments and named slots.
+
+    `{{ Name }}` placeholders become slots; rendering fills every slot and
+    joins the pieces once instead of running a replace pass per placeholder.
+    Root-relative href/src attributes in the literal segments are resolved
+    for `basepath` (or a full URLResolver) at compile time; `links` keeps
+    their (kind, url) as written.
+    """
+    def __init__(self, text, basepath='/', resolver=None):
+        if resolver is None:
+            resolver = URLResolver(basepath)
+        self.parts = []
+        self.slots = []
+        self.links = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self._add_literal(text[position:match.start()], resolver)
+            self.slots.append((len(self.parts), match.group(1), match.group(0)))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self._add_literal(text[position:], resolver)
+
+    def _add_literal(self, text, resolver):
+        self.links.extend(resolver.html_links(text))
+        self.parts.append(resolver.rewrite_html(text))
+
+    @property
+    def placeholders(self):
+        return [name for _, name, _ in self.slots]
+
+    def render(self, values):
+        # Unknown placeholders are left as written, like the old replace passes
+        parts = self.parts.copy()
+        for index, name, placeholder in self.slots:
+            parts[index] = str(values.get(name, placeholder))
+        return ''.join(parts)
+
+    def iter_render(self, values):
+        """Yield the filled template piece by piece.
+
+        A value may be an iterable of string chunks (e.g. HTMLNode.iter_html())
+        which is streamed into its slot instead of being joined first.
+        """
+        slots = iter(self.slots)
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                yield part
+                continue
+            _, name, placeholder = next(slots)
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                yield value
+            elif hasattr(value, '__iter__'):
+                yield from value
+            else:
+                yield str(value)
+
+@lru_cache(maxsize=16)
+def _compile_template(path, mtime_ns, size, resolver):
+    with open(path, 'r') as file:
+        return Template(file.read(), resolver=resolver)
+
+def load_template(path, basepath='/', resolver=None):
+    """Return the compiled template, reading the file only when it changed."""
+    if resolver is None:
+        resolver = URLResolver(basepath)
+    stat = Path(path).stat()
+    return _compile_template(str(path), stat.st_mtime_ns, stat.st_size, resolver)
+
+def page_url_key(template_path, resolver, links=()):
+    """The URL settings a page filled into `template_path` depends on.
+
+    That is `resolver.key` plus the fingerprinted names of the page's own
+    `links` and of the URLs in the template, see URLResolver.links_key.
+    """
+    template = load_template(template_path, resolver=resolver)
+    return resolver.links_key([*links, *template.links])
@@ -0,0 +1,39 @@
+import json, tempfile, unittest
+from pathlib import Path
+
+from assets import ASSET_MANIFEST_NAME, fingerprint_assets, fingerprinted_name, write_asset_manifest
+from manifest import BuildManifest, hash_bytes
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.static = self.root / 'static'
+        (self.static / 'images').mkdir(parents=True)
+        (self.static / 'index.css').write_text('body {}')
+        (self.static / 'images' / 'tom.png').write_bytes(b'png')
+        (self.static / 'robots.txt').write_text('User-agent: *')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name('index.css', '3f9a1c0b77'), 'index.3f9a1c0b.css')
+        self.assertEqual(fingerprinted_name('app.min.js', 'abcdef0123'), 'app.min.abcdef01.js')
+
+    def test_fingerprint_assets(self):
+        assets = fingerprint_assets(self.static)
+        self.assertEqual(assets, {
+            '/images/tom.png': f"/images/tom.{hash_bytes(b'png')[:8]}.png",
+            '/index.css': f"/index.{hash_bytes(b'body {}')[:8]}.css",
+        })
+        self.assertEqual(fingerprint_assets(self.static, BuildManifest(self.root / 'manifest.json')), assets)
+
+    def test_write_asset_manifest(self):
+        assets = fingerprint_assets(self.static)
+        path = write_asset_manifest(assets, self.root)
+        self.assertEqual(path, self.root / ASSET_MANIFEST_NAME)
+        self.assertEqual(json.loads(path.read_text()), assets)
+
+if __name__ == "__main__":
+    unittest.main()
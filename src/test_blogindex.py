@@ -0,0 +1,97 @@
+import io, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import blogindex
+from blogindex import PostIndex, listing_output, page_url
+from main import build_blog_index
+from manifest import BuildManifest
+from urlresolver import URLResolver
+
+class TestBlogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        self.public = self.root / 'public'
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}')
+        self.manifest = BuildManifest(self.root / 'manifest.json')
+        self.posts = PostIndex(self.root / 'posts.json')
+        self.write_post('old', '2023-01-05', 'Old post')
+        self.write_post('new', '2024-06-01', 'New post')
+        self.write_post('undated', None, 'Undated post')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_post(self, slug, date, title, draft=False):
+        path = self.content / 'blog' / slug / 'index.md'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        front = f'---\ndate: {date}\ndraft: {str(draft).lower()}\n---\n' if date else ''
+        path.write_text(f'{front}# {title}\n\nBody of {slug}')
+
+    def build(self, page_size=2, basepath='/'):
+        self.manifest.seen.clear()
+        with redirect_stdout(io.StringIO()):
+            return build_blog_index(self.content, self.template, self.public, URLResolver(basepath),
+                                    self.manifest, self.posts, page_size, quiet=True)
+
+    def test_page_url(self):
+        self.assertEqual(page_url(self.public / 'index.html', self.public), '/')
+        self.assertEqual(page_url(self.public / 'blog' / 'tom' / 'index.html', self.public), '/blog/tom')
+        self.assertEqual(page_url(self.public / 'blog' / 'note.html', self.public), '/blog/note.html')
+
+    def test_paginated_by_date(self):
+        self.assertEqual(self.build(), (2, 0))
+        first = listing_output(self.public, 1).read_text()
+        self.assertEqual(first, '<title>Blog</title><div><h1>Blog</h1><ul>'
+                                '<li><a href="/blog/new">New post</a> <time datetime="2024-06-01">2024-06-01</time></li>'
+                                '<li><a href="/blog/old">Old post</a> <time datetime="2023-01-05">2023-01-05</time></li>'
+                                '</ul><nav><span>Page 1 of 2</span>'
+                                '<a href="/blog/page/2" rel="next">Older posts</a></nav></div>')
+        second = listing_output(self.public, 2).read_text()
+        self.assertIn('<a href="/blog/undated">Undated post</a></li>', second)
+        self.assertIn('<a href="/blog" rel="prev">Newer posts</a>', second)
+        self.assertEqual(self.manifest.links[str(listing_output(self.public, 2))],
+                         [['link', '/blog/undated'], ['link', '/blog']])
+
+    def test_bodies_are_not_rendered_and_metadata_is_cached(self):
+        self.build()
+        with mock.patch.object(blogindex, 'read_post_meta', side_effect=AssertionError('read')):
+            # Unchanged posts and listing: nothing is read or written
+            self.assertEqual(self.build(), (0, 2))
+        self.write_post('old', '2023-01-05', 'Old post, renamed')
+        self.assertEqual(self.build(), (1, 1))
+        self.assertIn('Old post, renamed', listing_output(self.public, 1).read_text())
+        # A body edit keeps the metadata, so the listing is left alone
+        (self.content / 'blog' / 'new' / 'index.md').write_text('---\ndate: 2024-06-01\n---\n# New post\n\nEdited')
+        self.assertEqual(self.build(), (0, 2))
+
+    def test_shorter_listing_drops_pages_and_drafts(self):
+        self.build()
+        self.write_post('undated', '2022-01-01', 'Undated post', draft=True)
+        self.assertEqual(self.build(), (1, 0))
+        self.assertFalse((self.public / 'blog' / 'page').exists())
+        self.assertNotIn(str(listing_output(self.public, 2)), self.manifest.outputs)
+
+    def test_untitled_draft_and_broken_post_do_not_stop_the_listing(self):
+        (self.content / 'blog' / 'idea' / 'index.md').parent.mkdir()
+        (self.content / 'blog' / 'idea' / 'index.md').write_text('---\ndraft: true\n---\nnotes')
+        (self.content / 'blog' / 'broken' / 'index.md').parent.mkdir()
+        (self.content / 'blog' / 'broken' / 'index.md').write_text('no heading')
+        self.manifest.seen.clear()
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(build_blog_index(self.content, self.template, self.public, URLResolver('/'),
+                                              self.manifest, self.posts, 10, quiet=True), (1, 0))
+        self.assertIn(f"Failed: {self.content / 'blog' / 'broken' / 'index.md'}: ", out.getvalue())
+        self.assertNotIn('/blog/idea', listing_output(self.public, 1).read_text())
+
+    def test_hand_written_index_wins(self):
+        (self.content / 'blog' / 'index.md').write_text('# My blog')
+        self.assertEqual(self.build(), (0, 0))
+        self.assertFalse(listing_output(self.public, 1).exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io, json, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from buildreport import BuildReport, PageStats, PAGE_STAGES
+from main import generate_pages_recursive
+from mdhandler import INLINE_CACHE, generate_page
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def stats(self, source, seconds, size=10):
+        stats = PageStats(source, source + '.html')
+        stats.add('parse', seconds)
+        stats.input_bytes = size
+        stats.output_bytes = size * 2
+        return stats
+
+    def test_timed_chunks_passes_through_and_charges_stage(self):
+        stats = PageStats('a.md', 'a.html')
+        self.assertEqual(list(stats.timed_chunks(iter(['a', 'b']), 'render')), ['a', 'b'])
+        self.assertGreater(stats.stages['render'], 0)
+
+    def test_stats_round_trip(self):
+        stats = self.stats('a.md', 0.5)
+        self.assertEqual(PageStats.from_dict(stats.to_dict()).to_dict(), stats.to_dict())
+
+    def test_totals_slowest_and_summary(self):
+        report = BuildReport()
+        for source, seconds in [('a.md', 0.1), ('b.md', 0.3), ('c.md', 0.2)]:
+            report.add_page(self.stats(source, seconds))
+        report.skipped = 4
+        totals = report.totals()
+        self.assertEqual((totals['pages'], totals['generated'], totals['skipped']), (7, 3, 4))
+        self.assertEqual(totals['input_bytes'], 30)
+        self.assertAlmostEqual(totals['stages']['parse'], 0.6)
+        self.assertEqual([page.source for page in report.slowest(2)], ['b.md', 'c.md'])
+        report.pages[0].inline_hits, report.pages[0].inline_misses = 3, 1
+        self.assertEqual(report.totals()['inline_hits'], 3)
+        summary = report.summary(2)
+        self.assertIn('inline cache: 3 hits, 1 misses (75% hit rate)', summary)
+        self.assertIn('Slowest 2 page(s)', summary)
+        self.assertNotIn('a.md', summary)
+
+    def test_write_json(self):
+        report = BuildReport('/docs/', 4)
+        report.add_page(self.stats('a.md', 0.1))
+        report.add_section('sync', 0.01, copied=2)
+        report.finish()
+        path = self.root / 'cache' / 'report.json'
+        report.write(path)
+        data = json.loads(path.read_text())
+        self.assertEqual(data['basepath'], '/docs/')
+        self.assertEqual(data['sections']['sync']['copied'], 2)
+        self.assertEqual(data['pages'][0]['source'], 'a.md')
+
+    def test_generate_page_records_stages(self):
+        source = self.root / 'page.md'
+        source.write_text('# Title\n\nSome **bold** text\n\n- a\n- b')
+        template = self.root / 'template.html'
+        template.write_text('<title>{{ Title }}</title>{{ Content }}')
+        dest = self.root / 'page.html'
+        INLINE_CACHE.clear()
+        with redirect_stdout(io.StringIO()) as out:
+            stats = generate_page(str(source), str(template), str(dest), verbose=False)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(set(stats.stages), set(PAGE_STAGES))
+        self.assertTrue(all(seconds >= 0 for seconds in stats.stages.values()))
+        self.assertEqual(stats.input_bytes, os.path.getsize(source))
+        self.assertEqual(stats.output_bytes, os.path.getsize(dest))
+        self.assertEqual((stats.inline_hits, stats.inline_misses), (0, 3))
+
+    def test_quiet_build_fills_report(self):
+        content = self.root / 'content'
+        content.mkdir()
+        (content / 'index.md').write_text('# Home')
+        (content / 'about.md').write_text('# About')
+        template = self.root / 'template.html'
+        template.write_text('{{ Content }}')
+        report = BuildReport()
+        with redirect_stdout(io.StringIO()) as out:
+            generate_pages_recursive(content, template, self.root / 'public', '/', report=report, quiet=True)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(sorted(page.source for page in report.pages),
+                         [str(content / 'about.md'), str(content / 'index.md')])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import io, json, shutil, tarfile, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from buildreport import BuildReport
+from cachearchive import HEADER_NAME, CacheArchiveError, export_cache, import_cache
+from fragmentcache import FragmentCache
+from main import generate_pages_recursive
+from manifest import BuildManifest, hash_file
+from mdhandler import RENDERER_VERSION
+
+class TestCacheArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache_dir = self.root / '.build-cache'
+        self.archive = self.root / 'build-cache.tar.gz'
+        self.content = self.root / 'content'
+        self.content.mkdir()
+        for name in ['index', 'about', 'contact']:
+            (self.content / f'{name}.md').write_text(f'# {name}\n\nSome *text* with a [link](/{name}.html)')
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}')
+        self.public = self.root / 'public'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        manifest = BuildManifest.load(self.cache_dir / 'manifest.json')
+        report = BuildReport()
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.public, '/', manifest, report=report,
+                                     quiet=True, fragment_cache=FragmentCache(self.cache_dir / 'fragments'))
+        manifest.save()
+        return manifest, report
+
+    def write_archive(self, header, members=()):
+        with tarfile.open(self.archive, 'w:gz') as archive:
+            for name, data in [(HEADER_NAME, json.dumps(header).encode())] + list(members):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def test_round_trip(self):
+        self.build()
+        (self.cache_dir / 'images.json').write_text('{}')
+        (self.cache_dir / 'build-report.json').write_text('{}')
+        self.assertEqual(export_cache(self.archive, self.cache_dir), 5)
+        restored = self.root / 'restored'
+        self.assertEqual(import_cache(self.archive, restored), 5)
+        for path in self.cache_dir.rglob('*.json'):
+            if path.name != 'build-report.json':
+                relative = path.relative_to(self.cache_dir)
+                self.assertEqual((restored / relative).read_bytes(), path.read_bytes())
+        self.assertFalse((restored / 'build-report.json').exists())
+
+    def test_clean_checkout_rebuilds_only_changed_pages(self):
+        manifest, _ = self.build()
+        output = str(self.public / 'about.html')
+        self.assertEqual(manifest.output_hashes[output]['hash'], hash_file(output))
+        self.assertEqual(manifest.output_hashes[output]['size'], (self.public / 'about.html').stat().st_size)
+        export_cache(self.archive, self.cache_dir)
+        # A CI run starts without outputs or caches
+        shutil.rmtree(self.public)
+        shutil.rmtree(self.cache_dir)
+        (self.content / 'about.md').write_text('# about\n\nNew text')
+        import_cache(self.archive, self.cache_dir)
+        _, report = self.build()
+        self.assertEqual({Path(page.source).name: page.fragment_hit for page in report.pages},
+                         {'about.md': False, 'contact.md': True, 'index.md': True})
+
+    def test_rejects_corrupt_archive(self):
+        self.archive.write_bytes(b'not a tarball')
+        with self.assertRaises(CacheArchiveError):
+            import_cache(self.archive, self.cache_dir)
+
+    def test_rejects_stale_archive(self):
+        self.write_archive({'format': 'static-website-build-cache', 'version': 1,
+                            'renderer_version': RENDERER_VERSION + 1, 'manifest_version': 1})
+        with self.assertRaisesRegex(CacheArchiveError, 'renderer_version'):
+            import_cache(self.archive, self.cache_dir)
+
+    def test_rejects_unexpected_members_and_keeps_existing_cache(self):
+        self.build()
+        before = (self.cache_dir / 'manifest.json').read_bytes()
+        header = {'format': 'static-website-build-cache', 'version': 1,
+                  'renderer_version': RENDERER_VERSION, 'manifest_version': 1}
+        for member in [('../evil.json', b'{}'), ('manifest.json', b'{"version": 1'),
+                       ('images.json', b'[]'), ('fragments/00/x.json', b'{}')]:
+            self.write_archive(header, [('images.json', b'{}'), member])
+            with self.assertRaises(CacheArchiveError):
+                import_cache(self.archive, self.cache_dir)
+        self.assertEqual((self.cache_dir / 'manifest.json').read_bytes(), before)
+        self.assertFalse((self.root / 'evil.json').exists())
+        self.assertEqual(sorted(path.name for path in self.root.iterdir()),
+                         ['.build-cache', 'build-cache.tar.gz', 'content', 'public', 'template.html'])
+
+if __name__ == "__main__":
+    unittest.main()
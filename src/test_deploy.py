@@ -0,0 +1,71 @@
+import io, json, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from deploy import deploy_delta, update_deploy_manifest
+from main import generate_pages_recursive, sync_public_directory
+from manifest import BuildManifest, hash_text
+
+class TestDeployDelta(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        (self.content / 'blog').mkdir(parents=True)
+        (self.content / 'index.md').write_text('# Home')
+        (self.content / 'blog' / 'post.md').write_text('# Post\n\nFirst draft')
+        self.static = self.root / 'static'
+        self.static.mkdir()
+        (self.static / 'index.css').write_text('body {}')
+        self.template = self.root / 'template.html'
+        self.template.write_text('{{ Content }}')
+        self.public = self.root / 'public'
+        self.manifest_path = self.root / '.build-cache' / 'manifest.json'
+        self.delta_path = self.root / '.build-cache' / 'deploy-manifest.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        with redirect_stdout(io.StringIO()):
+            sync_public_directory(self.static, self.public, manifest)
+            generate_pages_recursive(self.content, self.template, self.public, '/', manifest, quiet=True)
+            manifest.remove_stale()
+        delta = update_deploy_manifest(self.public, manifest, self.delta_path)
+        manifest.save()
+        return delta
+
+    def paths(self, entries):
+        return [entry['path'] for entry in entries]
+
+    def test_delta_of_snapshots(self):
+        previous = {'a': {'hash': '1', 'size': 1}, 'b': {'hash': '2', 'size': 1}}
+        current = {'a': {'hash': '1', 'size': 1}, 'b': {'hash': '3', 'size': 2}, 'c': {'hash': '4', 'size': 3}}
+        self.assertEqual(deploy_delta(previous, current), {
+            'added': [{'path': 'c', 'hash': '4', 'size': 3}],
+            'modified': [{'path': 'b', 'hash': '3', 'size': 2}],
+            'deleted': [],
+            'unchanged': 1,
+        })
+        self.assertEqual(deploy_delta(current, {})['deleted'][0], {'path': 'a', 'hash': '1', 'size': 1})
+
+    def test_first_build_adds_everything(self):
+        delta = self.build()
+        self.assertEqual(self.paths(delta['added']), ['blog/post.html', 'index.css', 'index.html'])
+        self.assertEqual(json.loads(self.delta_path.read_text())['added'], delta['added'])
+
+    def test_single_edit_lists_only_that_page(self):
+        self.build()
+        (self.content / 'blog' / 'post.md').write_text('# Post\n\nSecond draft')
+        (self.content / 'index.md').unlink()
+        delta = self.build()
+        self.assertEqual(delta['added'], [])
+        self.assertEqual(self.paths(delta['modified']), ['blog/post.html'])
+        self.assertEqual(delta['modified'][0]['hash'], hash_text('<div><h1>Post</h1><p>Second draft</p></div>'))
+        self.assertEqual(self.paths(delta['deleted']), ['index.html'])
+        self.assertEqual(delta['unchanged'], 1)
+        self.assertEqual(self.build(), {'added': [], 'modified': [], 'deleted': [], 'unchanged': 2})
+
+if __name__ == "__main__":
+    unittest.main()
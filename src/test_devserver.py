@@ -0,0 +1,81 @@
+import os, tempfile, threading, unittest
+from unittest import mock
+from pathlib import Path
+from urllib.request import urlopen
+
+from devserver import Watcher, LiveReload, LiveReloadHandler, inject_livereload, start_server, LIVERELOAD_PATH, LIVERELOAD_SCRIPT
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'content' / 'blog').mkdir(parents=True)
+        (self.root / 'content' / 'index.md').write_text('# Home')
+        self.template = self.root / 'template.html'
+        self.template.write_text('{{ Content }}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def bump(self, path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_watcher_reports_created_modified_removed(self):
+        watcher = Watcher([self.root / 'content', self.template, self.root / 'missing'])
+        self.assertEqual(watcher.poll(), [])
+        post = self.root / 'content' / 'blog' / 'post.md'
+        post.write_text('# Post')
+        self.bump(self.template)
+        self.assertEqual(watcher.poll(), sorted([str(post), str(self.template)]))
+        self.assertEqual(watcher.poll(), [])
+        os.remove(self.root / 'content' / 'index.md')
+        self.assertEqual(watcher.poll(), [str(self.root / 'content' / 'index.md')])
+
+    def test_watcher_expands_globs(self):
+        watcher = Watcher([self.root / '*.html'])
+        post_template = self.root / 'post.html'
+        post_template.write_text('<article>{{ Content }}</article>')
+        (self.root / 'notes.txt').write_text('not a template')
+        self.assertEqual(watcher.poll(), [str(post_template)])
+        self.bump(self.template)
+        self.assertEqual(watcher.poll(), [str(self.template)])
+
+    def test_inject_livereload(self):
+        self.assertEqual(
+            inject_livereload(b'<html><body>x</body></html>'),
+            b'<html><body>x' + LIVERELOAD_SCRIPT + b'</body></html>'
+        )
+        self.assertEqual(inject_livereload(b'<p>x</p>'), b'<p>x</p>' + LIVERELOAD_SCRIPT)
+
+    def test_livereload_wait(self):
+        livereload = LiveReload()
+        self.assertEqual(livereload.wait(0, timeout=0.01), 0)
+        livereload.notify()
+        self.assertEqual(livereload.wait(0, timeout=0.01), 1)
+
+    def test_server_injects_script_and_streams_reload(self):
+        public = self.root / 'public'
+        (public / 'blog').mkdir(parents=True)
+        (public / 'blog' / 'index.html').write_text('<body>post</body>')
+        (public / 'index.css').write_text('body {}')
+        livereload = LiveReload()
+        quiet = mock.patch.object(LiveReloadHandler, 'log_message')
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        server = start_server(public, 0, livereload)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            with urlopen(base + '/blog/') as response:
+                self.assertIn(LIVERELOAD_SCRIPT, response.read())
+            with urlopen(base + '/index.css') as response:
+                self.assertEqual(response.read(), b'body {}')
+            with urlopen(base + LIVERELOAD_PATH, timeout=5) as response:
+                threading.Timer(0.05, livereload.notify).start()
+                self.assertEqual(response.readline(), b'data: reload\n')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import io, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from fragmentcache import FragmentCache
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from mdhandler import RENDERER_VERSION, generate_page, recording_links
+from urlresolver import URLResolver
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = FragmentCache(self.root / 'fragments')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_and_get(self):
+        key = self.cache.key('# T', RENDERER_VERSION, '/')
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, 'T', '<div><h1>T</h1></div>', [('link', '/a')], '/')
+        self.assertEqual(self.cache.get(key), {'title': 'T', 'html': '<div><h1>T</h1></div>', 'links': [['link', '/a']],
+                                               'urls': '/'})
+
+    def test_key_covers_version_and_urls(self):
+        key = self.cache.key('# T', 1, '/')
+        self.assertNotEqual(key, self.cache.key('# T', 2, '/'))
+        self.assertNotEqual(key, self.cache.key('# T', 1, '/docs/'))
+        self.assertNotEqual(key, self.cache.key('# U', 1, '/'))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = [self.cache.key(str(number), 1, '/') for number in range(3)]
+        for age, key in enumerate(keys):
+            self.cache.put(key, 'T', 'x' * 100, [])
+            path = self.cache._entry_path(key)
+            os.utime(path, ns=(0, 10**18 + age * 10**9))
+        # Reading the oldest entry makes it the most recently used
+        self.cache.get(keys[0])
+        size = os.path.getsize(self.cache._entry_path(keys[0]))
+        self.assertEqual(self.cache.prune(2 * size), (1, 2 * size))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertEqual(self.cache.prune(0), (2, 0))
+        self.assertEqual(list(self.cache.path.iterdir()), [])
+
+class TestCachedPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        self.content.mkdir()
+        (self.content / 'index.md').write_text('# Home\n\n[About](/about) and ![pic](/a.png)')
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}')
+        self.public = self.root / 'public'
+        self.cache = FragmentCache(self.root / 'fragments')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, basepath='/'):
+        with redirect_stdout(io.StringIO()), recording_links() as links:
+            stats = generate_page(str(self.content / 'index.md'), str(self.template), str(self.root / 'out.html'),
+                                  resolver=URLResolver(basepath), fragment_cache=self.cache)
+        return stats, links, (self.root / 'out.html').read_text()
+
+    def test_second_render_reuses_content(self):
+        first, first_links, html = self.render()
+        second, second_links, cached_html = self.render()
+        self.assertFalse(first.fragment_hit)
+        self.assertTrue(second.fragment_hit)
+        self.assertEqual(second.stages['parse'], 0)
+        self.assertEqual(cached_html, html)
+        self.assertEqual(second_links, first_links)
+        self.assertEqual(first_links, [('link', '/about'), ('image', '/a.png')])
+
+    def test_basepath_change_renders_again(self):
+        self.render()
+        stats, _, html = self.render('/docs/')
+        self.assertFalse(stats.fragment_hit)
+        self.assertIn('href="/docs/about"', html)
+
+    def test_template_change_only_refills_template(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.public, '/', manifest,
+                                     fragment_cache=self.cache)
+            self.template.write_text('<h1>{{ Title }}</h1>{{ Content }}')
+            os.utime(self.template, ns=(0, self.template.stat().st_mtime_ns + 10**9))
+            self.assertEqual(generate_pages_recursive(self.content, self.template, self.public, '/', manifest,
+                                                      fragment_cache=self.cache), 1)
+        html = (self.public / 'index.html').read_text()
+        self.assertTrue(html.startswith('<h1>Home</h1><div><h1>Home</h1>'))
+        self.assertEqual(manifest.links[str(self.public / 'index.html')], [['link', '/about'], ['image', '/a.png']])
+
+if __name__ == "__main__":
+    unittest.main()
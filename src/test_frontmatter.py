@@ -0,0 +1,108 @@
+import io, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import mdhandler
+from frontmatter import (FrontMatterError, page_template, parse_front_matter, read_front_matter,
+                         split_front_matter, template_values)
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from mdhandler import generate_page
+
+FRONT_MATTER = '''---
+title: "Hello: world"
+date: 2024-03-01
+tags: [python, web]
+draft: no
+# a comment
+authors:
+  - Ann
+  - Bo
+---
+'''
+
+class TestFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse(self):
+        meta, body = split_front_matter(FRONT_MATTER + '# Heading\n\nText')
+        self.assertEqual(meta, {'title': 'Hello: world', 'date': '2024-03-01', 'tags': ['python', 'web'],
+                                'draft': False, 'authors': ['Ann', 'Bo']})
+        self.assertEqual(body, '# Heading\n\nText')
+        self.assertEqual(parse_front_matter(['tags: a, b'])['tags'], ['a', 'b'])
+
+    def test_without_front_matter(self):
+        self.assertEqual(split_front_matter('# Title\n\n---\n'), ({}, '# Title\n\n---\n'))
+
+    def test_errors_name_the_line(self):
+        for lines, line, message in [(['title: x', 'date: 1 March'], 3, 'date'),
+                                     (['draft: maybe'], 2, 'draft'),
+                                     (['title: x', 'not a pair'], 3, 'key: value')]:
+            with self.assertRaisesRegex(FrontMatterError, f'page.md:{line}: .*{message}'):
+                parse_front_matter(lines, 'page.md')
+        with self.assertRaisesRegex(FrontMatterError, 'not closed'):
+            split_front_matter('---\ntitle: x\n# Heading')
+
+    def test_read_stops_at_the_body(self):
+        path = self.root / 'page.md'
+        path.write_bytes(FRONT_MATTER.encode() + b'\xff not utf-8')
+        meta, offset = read_front_matter(path)
+        self.assertEqual(meta['title'], 'Hello: world')
+        self.assertEqual(offset, len(FRONT_MATTER.encode()))
+        path.write_bytes(b'# Title\n\xff')
+        self.assertEqual(read_front_matter(path), ({}, 0))
+
+    def test_template_helpers(self):
+        self.assertEqual(page_template({}, 'site/template.html'), 'site/template.html')
+        self.assertEqual(page_template({'template': 'post.html'}, 'site/template.html'), Path('site/post.html'))
+        self.assertEqual(template_values({'date': '2024-03-01', 'tags': ['a', 'b'], 'draft': True}),
+                         {'Date': '2024-03-01', 'Tags': 'a, b'})
+
+    def test_generate_page_uses_front_matter(self):
+        source = self.root / 'page.md'
+        source.write_text('---\ntitle: From front matter\ndate: 2024-03-01\ntemplate: post.html\n---\n'
+                          '# Heading\n\nText')
+        (self.root / 'template.html').write_text('{{ Content }}')
+        (self.root / 'post.html').write_text('<title>{{ Title }}</title><time>{{ Date }}</time>{{ Content }}')
+        outputs = []
+        threshold = mdhandler.STREAMING_THRESHOLD
+        try:
+            for mdhandler.STREAMING_THRESHOLD in (threshold, 0):
+                dest = self.root / f'out{len(outputs)}.html'
+                generate_page(str(source), str(self.root / 'template.html'), str(dest), verbose=False)
+                outputs.append(dest.read_text())
+        finally:
+            mdhandler.STREAMING_THRESHOLD = threshold
+        self.assertEqual(outputs[0], '<title>From front matter</title><time>2024-03-01</time>'
+                                     '<div><h1>Heading</h1><p>Text</p></div>')
+        self.assertEqual(outputs[1], outputs[0])
+
+    def test_drafts_are_skipped_and_removed(self):
+        content = self.root / 'content'
+        content.mkdir()
+        (content / 'index.md').write_text('# Home')
+        (content / 'post.md').write_text('# Post')
+        template = self.root / 'template.html'
+        template.write_text('{{ Content }}')
+        public = self.root / 'public'
+        manifest = BuildManifest(self.root / 'manifest.json')
+
+        def build(drafts=False):
+            manifest.seen.clear()
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, template, public, '/', manifest, drafts=drafts)
+            manifest.remove_stale()
+            return sorted(os.listdir(public))
+
+        self.assertEqual(build(), ['index.html', 'post.html'])
+        (content / 'post.md').write_text('---\ndraft: true\n---\n# Post')
+        self.assertEqual(build(), ['index.html'])
+        self.assertEqual(build(drafts=True), ['index.html', 'post.html'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-import unittest
+import io, sys, unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -104,5 +104,45 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text"), LeafNode("br", None)]),
+            ParentNode("ul", [ParentNode("li", [LeafNode("a", "link", props={"href": "/x"})])], {"class": "list"}),
+            LeafNode("img", None, props={"src": "/a.png", "alt": "a"}),
+        ])
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            "".join(chunks),
+            '<div><p><b>bold</b> text<br></p><ul class="list"><li><a href="/x">link</a></li></ul><img src="/a.png" alt="a" /></div>'
+        )
+
+    def test_deep_tree_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode("b", "leaf")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * depth + "<b>leaf</b>"))
+        self.assertTrue(html.endswith("</span>" * depth))
+
+    def test_write_to(self):
+        node = ParentNode("p", [LeafNode("i", "streamed")])
+        out = io.StringIO()
+        node.write_to(out)
+        self.assertEqual(out.getvalue(), "<p><i>streamed</i></p>")
+
+    def test_nested_parent_errors_still_raised(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+        with self.assertRaises(ValueError):
+            ParentNode(None, [LeafNode("b", "x")]).to_html()
+
+    def test_none_child_is_not_dropped(self):
+        node = ParentNode("div", [LeafNode("b", "x"), None, LeafNode("i", "lost")])
+        with self.assertRaises(AttributeError):
+            node.to_html()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
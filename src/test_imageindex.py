@@ -0,0 +1,91 @@
+import struct, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+import imageindex
+from imageindex import ImageIndex, read_image_size
+from manifest import BuildManifest
+
+def png(width, height):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+def jpeg(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+    sof = b'\xff\xc2' + struct.pack('>HBHH', 17, 8, height, width) + b'\x03' + b'\x00' * 9
+    return b'\xff\xd8' + app0 + b'\xff' + sof + b'\xff\xd9'
+
+def webp(chunk, payload):
+    return b'RIFF' + struct.pack('<I', 4 + 8 + len(payload)) + b'WEBP' + chunk + struct.pack('<I', len(payload)) + payload
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data):
+        path = self.root / 'image'
+        path.write_bytes(data)
+        return read_image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png(1079, 720)), (1079, 720))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(b'GIF89a' + struct.pack('<HH', 320, 200) + b'\x00' * 8), (320, 200))
+
+    def test_jpeg_skips_to_frame_header(self):
+        self.assertEqual(self.size_of(jpeg(640, 480)), (640, 480))
+
+    def test_webp_variants(self):
+        lossy = b'\x00' * 3 + b'\x9d\x01\x2a' + struct.pack('<HH', 400, 300) + b'\x00' * 4
+        self.assertEqual(self.size_of(webp(b'VP8 ', lossy)), (400, 300))
+        bits = (400 - 1) | ((300 - 1) << 14)
+        self.assertEqual(self.size_of(webp(b'VP8L', b'\x2f' + struct.pack('<I', bits) + b'\x00' * 4)), (400, 300))
+        extended = b'\x00' * 4 + (400 - 1).to_bytes(3, 'little') + (300 - 1).to_bytes(3, 'little')
+        self.assertEqual(self.size_of(webp(b'VP8X', extended)), (400, 300))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size_of(b'not an image'))
+        self.assertIsNone(self.size_of(jpeg(640, 480)[:12]))
+
+class TestImageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.static = self.root / 'static'
+        (self.static / 'images').mkdir(parents=True)
+        (self.static / 'images' / 'a.png').write_bytes(png(10, 20))
+        (self.static / 'images' / 'b.gif').write_bytes(b'GIF87a' + struct.pack('<HH', 3, 4))
+        (self.static / 'index.css').write_text('body {}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_maps_urls_to_sizes(self):
+        index = ImageIndex(self.root / 'images.json')
+        self.assertEqual(index.scan(self.static), {'/images/a.png': (10, 20), '/images/b.gif': (3, 4)})
+
+    def test_headers_read_once_per_hash(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        index = ImageIndex(self.root / 'images.json')
+        index.scan(self.static, manifest)
+        index.save()
+        (self.static / 'images' / 'c.png').write_bytes(png(10, 20))
+        loaded = ImageIndex.load(self.root / 'images.json')
+        with mock.patch.object(imageindex, 'read_image_size', wraps=read_image_size) as read:
+            urls = loaded.scan(self.static, manifest)
+        read.assert_not_called()
+        self.assertEqual(urls['/images/c.png'], (10, 20))
+
+    def test_removed_images_are_forgotten(self):
+        index = ImageIndex(self.root / 'images.json')
+        index.scan(self.static)
+        (self.static / 'images' / 'b.gif').unlink()
+        index.scan(self.static)
+        self.assertEqual(len(index.entries), 1)
+
+if __name__ == "__main__":
+    unittest.main()
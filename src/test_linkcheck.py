@@ -0,0 +1,87 @@
+import io, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from linkcheck import LinkIndex
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from mdhandler import INLINE_CACHE, markdown_to_html_node, recording_links
+from urlresolver import URLResolver
+
+class TestRecordingLinks(unittest.TestCase):
+    def test_records_links_and_images_including_cache_hits(self):
+        markdown = '# [Home](/) title\n\n[a](/a) and ![i](/i.png)\n\n- [a](/a) and ![i](/i.png)\n\n```\n[code](/code)\n```'
+        INLINE_CACHE.clear()
+        with recording_links() as links:
+            markdown_to_html_node(markdown)
+            markdown_to_html_node(markdown)
+        expected = [('link', '/'), ('link', '/a'), ('image', '/i.png'), ('link', '/a'), ('image', '/i.png')]
+        self.assertEqual(links, expected * 2)
+        self.assertGreater(INLINE_CACHE.hits, 0)
+
+    def test_not_recording_outside_block(self):
+        with recording_links() as links:
+            pass
+        markdown_to_html_node('[a](/a)')
+        self.assertEqual(links, [])
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.public = self.root / 'public'
+        self.source = self.root / 'post.md'
+        self.source.write_text('# Post\n\n[ok](/blog/tom)\n\n[missing](/nope)\n')
+        self.index = LinkIndex(self.public)
+        self.index.add_output(self.public / 'index.css')
+        self.index.add_output(self.public / 'images' / 'a.png')
+        self.index.add_page(self.public / 'blog' / 'tom' / 'index.html', None, [])
+        self.index.add_page(self.public / 'contact.html', None, [])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def broken(self, links, resolver=None):
+        self.index.add_page(self.public / 'blog' / 'post' / 'index.html', self.source, links)
+        return [(link.kind, link.url) for link in self.index.check(resolver)]
+
+    def test_internal_links(self):
+        links = [('link', '/blog/tom'), ('link', '/blog/tom/'), ('link', '/contact.html'), ('link', '/nope'),
+                 ('link', '/index.css?v=1#x'), ('image', '/images/a.png'), ('image', '/images/b.png')]
+        self.assertEqual(self.broken(links), [('link', '/nope'), ('image', '/images/b.png')])
+
+    def test_relative_and_external_links(self):
+        links = [('link', '../tom'), ('link', '../../contact.html'), ('link', 'missing'),
+                 ('link', 'https://example.com/x'), ('link', '#top'), ('link', 'mailto:a@b.c')]
+        self.assertEqual(self.broken(links), [('link', 'missing')])
+
+    def test_basepath_prefix_and_fingerprints(self):
+        self.index.add_output(self.public / 'images' / 'c.1234abcd.png')
+        resolver = URLResolver('/sw/', 'https://cdn.example.com/site', {'/images/c.png': '/images/c.1234abcd.png'})
+        links = [('link', '/blog/tom'), ('image', '/images/c.png'), ('link', '/sw/blog/tom')]
+        self.assertEqual(self.broken(links, resolver), [('link', '/sw/blog/tom')])
+
+    def test_source_location(self):
+        self.index.add_page(self.public / 'blog' / 'post' / 'index.html', self.source, [('link', '/nope')])
+        [link] = self.index.check()
+        self.assertEqual(link.location, f'{self.source}:5')
+        self.assertEqual(str(link), f'Broken link: {self.source}:5: /nope -> /nope')
+
+    def test_unchanged_pages_are_checked_from_manifest(self):
+        content = self.root / 'content'
+        content.mkdir()
+        (content / 'index.md').write_text('# Home\n\n[gone](/gone)')
+        template = self.root / 'template.html'
+        template.write_text('{{ Content }}')
+        manifest = BuildManifest(self.root / 'manifest.json')
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content, template, self.public, '/', manifest)
+        manifest.save()
+        manifest = BuildManifest.load(self.root / 'manifest.json')
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(generate_pages_recursive(content, template, self.public, '/', manifest), 0)
+        [link] = LinkIndex.from_manifest(manifest, self.public).check()
+        self.assertEqual((link.url, link.line), ('/gone', 3))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+import io, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from assets import fingerprint_assets
+from imageindex import ImageIndex
+from manifest import BuildManifest, hash_file
+from main import sync_public_directory, collect_pages, generate_pages_recursive, rebuild_changed, PageBuildError
+
+class TestSyncPublicDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.static = self.root / 'static'
+        (self.static / 'images').mkdir(parents=True)
+        (self.static / 'index.css').write_text('body {}')
+        (self.static / 'images' / 'tom.png').write_bytes(b'png')
+        self.public = self.root / 'public'
+        self.manifest = BuildManifest(self.root / 'manifest.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self):
+        with redirect_stdout(io.StringIO()) as out:
+            counts = sync_public_directory(self.static, self.public, self.manifest)
+        self.output = out.getvalue()
+        return counts
+
+    def test_first_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertEqual((self.public / 'images' / 'tom.png').read_bytes(), b'png')
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync(), (0, 2, 0))
+        self.assertEqual(self.output.count('\n'), 1)
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        css = self.static / 'index.css'
+        css.write_text('body { margin: 0 }')
+        self.assertEqual(self.sync(), (1, 1, 0))
+        self.assertEqual((self.public / 'index.css').read_text(), 'body { margin: 0 }')
+
+    def test_orphaned_asset_removed_and_pages_kept(self):
+        self.sync()
+        (self.public / 'index.html').write_text('<html></html>')
+        os.remove(self.static / 'images' / 'tom.png')
+        self.assertEqual(self.sync(), (0, 1, 1))
+        self.assertFalse((self.public / 'images').exists())
+        self.assertTrue((self.public / 'index.html').exists())
+
+    def test_fingerprinted_assets_replace_plain_copies(self):
+        self.sync()
+        assets = fingerprint_assets(self.static, self.manifest)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(sync_public_directory(self.static, self.public, self.manifest, assets), (2, 0, 2))
+        css = self.public / assets['/index.css'][1:]
+        self.assertRegex(css.name, r'^index\.[0-9a-f]{8}\.css$')
+        self.assertEqual(css.read_text(), 'body {}')
+        self.assertFalse((self.public / 'index.css').exists())
+        self.assertTrue((self.public / assets['/images/tom.png'][1:]).exists())
+
+    def test_missing_source_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_public_directory(self.root / 'missing', self.public)
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        for name in ['b', 'a', 'c']:
+            (self.content / 'blog' / name).mkdir(parents=True)
+            (self.content / 'blog' / name / 'index.md').write_text(f'# Post {name}\n\nText with **{name}**')
+        (self.content / 'index.md').write_text('# Home')
+        (self.content / 'about.md').write_text('# About')
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}')
+        self.public = self.root / 'public'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, jobs):
+        with redirect_stdout(io.StringIO()) as out:
+            generate_pages_recursive(self.content, self.template, self.public, '/', jobs=jobs)
+        return out.getvalue()
+
+    def test_collect_pages_is_sorted(self):
+        pages = collect_pages(self.content, self.public)
+        self.assertEqual(
+            [str(html.relative_to(self.public)) for _, html in pages],
+            ['about.html', 'blog/a/index.html', 'blog/b/index.html', 'blog/c/index.html', 'index.html']
+        )
+
+    def test_parallel_matches_sequential(self):
+        sequential_log = self.generate(1)
+        sequential = {p: p.read_text() for p in self.public.rglob('*.html')}
+        parallel_log = self.generate(4)
+        parallel = {p: p.read_text() for p in self.public.rglob('*.html')}
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(parallel_log, sequential_log)
+
+    def test_failure_reports_source_path(self):
+        broken = self.content / 'blog' / 'b' / 'index.md'
+        broken.write_text('# Broken\n\nUnclosed **bold')
+        for jobs in (1, 3):
+            with self.assertRaises(PageBuildError) as cm:
+                self.generate(jobs)
+            self.assertEqual([source for source, _ in cm.exception.failures], [str(broken)])
+            self.assertIn(str(broken), str(cm.exception))
+            self.assertTrue((self.public / 'blog' / 'c' / 'index.html').exists())
+
+class TestRebuildChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        (self.content / 'blog').mkdir(parents=True)
+        (self.content / 'index.md').write_text('# Home')
+        (self.content / 'blog' / 'post.md').write_text('# Post')
+        self.static = self.root / 'static'
+        self.static.mkdir()
+        (self.static / 'index.css').write_text('body {}')
+        self.template = self.root / 'template.html'
+        self.template.write_text('{{ Content }}')
+        self.public = self.root / 'public'
+        self.manifest = BuildManifest(self.root / 'manifest.json')
+        self.rebuild([self.static / 'index.css', self.template])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rebuild(self, changed):
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed(changed, '/', self.manifest, self.content, self.template, self.static, self.public)
+        return out.getvalue()
+
+    def test_template_change_builds_everything(self):
+        self.assertTrue((self.public / 'index.html').exists())
+        self.assertTrue((self.public / 'blog' / 'post.html').exists())
+        self.assertTrue((self.public / 'index.css').exists())
+        self.assertTrue(self.manifest.path.exists())
+
+    def test_content_change_builds_only_that_page(self):
+        post = self.content / 'blog' / 'post.md'
+        post.write_text('# Post\n\nedited')
+        log = self.rebuild([post])
+        self.assertEqual(log.count('Generating page'), 1)
+        self.assertIn('edited', (self.public / 'blog' / 'post.html').read_text())
+
+    def test_fingerprinted_asset_change_rebuilds_pages(self):
+        assets = fingerprint_assets(self.static)
+        self.template.write_text('<link href="/index.css">{{ Content }}')
+        with redirect_stdout(io.StringIO()):
+            rebuild_changed([self.template], '/', self.manifest, self.content, self.template, self.static,
+                            self.public, assets=assets)
+        old_url = assets['/index.css']
+        self.assertIn(old_url, (self.public / 'index.html').read_text())
+        (self.static / 'index.css').write_text('body { margin: 0 }')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([self.static / 'index.css'], '/', self.manifest, self.content, self.template,
+                            self.static, self.public, assets=assets)
+        self.assertNotEqual(assets['/index.css'], old_url)
+        self.assertEqual(out.getvalue().count('Generating page'), 2)
+        self.assertIn(assets['/index.css'], (self.public / 'blog' / 'post.html').read_text())
+        self.assertTrue((self.public / assets['/index.css'][1:]).exists())
+        self.assertFalse((self.public / old_url[1:]).exists())
+
+    def test_fingerprinted_asset_change_rebuilds_only_pages_using_it(self):
+        (self.static / 'a.png').write_bytes(b'a')
+        (self.content / 'index.md').write_text('# Home\n\n![a](/a.png)')
+        assets = fingerprint_assets(self.static)
+        with redirect_stdout(io.StringIO()):
+            rebuild_changed([self.template], '/', self.manifest, self.content, self.template, self.static,
+                            self.public, assets=assets)
+        (self.static / 'unused.png').write_bytes(b'u')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([self.static / 'unused.png'], '/', self.manifest, self.content, self.template,
+                            self.static, self.public, assets=assets)
+        self.assertEqual(out.getvalue().count('Generating page'), 0)
+        (self.static / 'a.png').write_bytes(b'b')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([self.static / 'a.png'], '/', self.manifest, self.content, self.template,
+                            self.static, self.public, assets=assets)
+        self.assertEqual(out.getvalue().count('Generating page'), 1)
+        self.assertIn(assets['/a.png'], (self.public / 'index.html').read_text())
+
+    def test_image_size_change_rebuilds_only_pages_using_it(self):
+        (self.static / 'a.gif').write_bytes(b'GIF89a\x01\x00\x01\x00')
+        (self.content / 'index.md').write_text('# Home\n\n![a](/a.gif)')
+        images = ImageIndex(self.root / 'images.json')
+        images.scan(self.static)
+        with redirect_stdout(io.StringIO()):
+            rebuild_changed([self.template], '/', self.manifest, self.content, self.template, self.static,
+                            self.public, images=images)
+        (self.static / 'other.gif').write_bytes(b'GIF89a\x02\x00\x02\x00')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([self.static / 'other.gif'], '/', self.manifest, self.content, self.template,
+                            self.static, self.public, images=images)
+        self.assertEqual(out.getvalue().count('Generating page'), 0)
+        (self.static / 'a.gif').write_bytes(b'GIF89a\x03\x00\x04\x00')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([self.static / 'a.gif'], '/', self.manifest, self.content, self.template,
+                            self.static, self.public, images=images)
+        self.assertEqual(out.getvalue().count('Generating page'), 1)
+        self.assertIn('width="3" height="4"', (self.public / 'index.html').read_text())
+
+    def test_per_page_template_change_rebuilds_its_pages(self):
+        post_template = self.root / 'post.html'
+        post_template.write_text('<article>{{ Content }}</article>')
+        post = self.content / 'blog' / 'post.md'
+        post.write_text('---\ntemplate: post.html\n---\n# Post')
+        self.rebuild([post])
+        post_template.write_text('<main>{{ Content }}</main>')
+        log = self.rebuild([post_template])
+        self.assertEqual(log.count('Generating page'), 1)
+        self.assertIn('<main>', (self.public / 'blog' / 'post.html').read_text())
+
+    def test_failing_page_does_not_stop_the_others(self):
+        index = self.content / 'index.md'
+        post = self.content / 'blog' / 'post.md'
+        index.write_text('---\ntitle: unclosed')
+        post.write_text('# Post\n\nedited')
+        with self.assertRaises(PageBuildError) as cm, redirect_stdout(io.StringIO()):
+            rebuild_changed([index, post], '/', self.manifest, self.content, self.template, self.static,
+                            self.public)
+        self.assertEqual([source for source, _ in cm.exception.failures], [str(index)])
+        self.assertIn('edited', (self.public / 'blog' / 'post.html').read_text())
+        saved = BuildManifest.load(self.manifest.path)
+        self.assertEqual(saved.outputs[str(self.public / 'blog' / 'post.html')]['source_hash'], hash_file(post))
+
+    def test_quiet_rebuild_does_not_log_pages(self):
+        post = self.content / 'blog' / 'post.md'
+        post.write_text('# Post\n\nedited')
+        with redirect_stdout(io.StringIO()) as out:
+            rebuild_changed([post], '/', self.manifest, self.content, self.template, self.static, self.public,
+                            quiet=True)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_removed_source_removes_page(self):
+        post = self.content / 'blog' / 'post.md'
+        post.unlink()
+        self.rebuild([post])
+        self.assertFalse((self.public / 'blog' / 'post.html').exists())
+        self.assertNotIn(str(self.public / 'blog' / 'post.html'), self.manifest.outputs)
+
+if __name__ == "__main__":
+    unittest.main()
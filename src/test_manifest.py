@@ -0,0 +1,138 @@
+import io, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import main
+
+from manifest import BuildManifest, ContentIndex, hash_file, hash_text, load_json, save_json
+from main import generate_pages_recursive
+from mdhandler import RENDERER_VERSION
+
+TEMPLATE = '<title>{{ Title }}</title><article>{{ Content }}</article>'
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        (self.content / 'blog').mkdir(parents=True)
+        (self.content / 'index.md').write_text('# Home\n\nWelcome')
+        (self.content / 'blog' / 'post.md').write_text('# Post\n\nSome **bold** text')
+        self.template = self.root / 'template.html'
+        self.template.write_text(TEMPLATE)
+        self.public = self.root / 'public'
+        self.manifest_path = self.root / '.build-cache' / 'manifest.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath='/'):
+        manifest = BuildManifest.load(self.manifest_path)
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.public, basepath, manifest)
+        removed = manifest.remove_stale(self.public)
+        manifest.save()
+        return manifest, removed
+
+    def mtimes(self):
+        return {str(p): p.stat().st_mtime_ns for p in self.public.rglob('*.html')}
+
+    def touch_later(self, path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_hash_helpers(self):
+        self.assertEqual(hash_file(self.template), hash_text(TEMPLATE))
+
+    def test_file_hash_reuses_cached_entry(self):
+        manifest = BuildManifest(self.manifest_path)
+        digest = manifest.file_hash(self.template)
+        manifest.files[str(self.template)]['hash'] = 'cached'
+        self.assertEqual(manifest.file_hash(self.template), 'cached')
+        self.touch_later(self.template)
+        self.assertEqual(manifest.file_hash(self.template), digest)
+
+    def test_unchanged_build_skips_every_page(self):
+        self.build()
+        before = self.mtimes()
+        self.build()
+        self.assertEqual(self.mtimes(), before)
+
+    def test_edit_rebuilds_only_that_page(self):
+        self.build()
+        before = self.mtimes()
+        post = self.content / 'blog' / 'post.md'
+        post.write_text('# Post\n\nEdited text')
+        self.touch_later(post)
+        self.build()
+        after = self.mtimes()
+        index = str(self.public / 'index.html')
+        self.assertEqual(after[index], before[index])
+        self.assertIn('Edited text', (self.public / 'blog' / 'post.html').read_text())
+
+    def test_template_or_basepath_change_rebuilds_all(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        inputs = manifest.page_inputs(self.content / 'index.md', self.template, '/docs/', RENDERER_VERSION)
+        self.assertFalse(manifest.is_fresh(self.public / 'index.html', inputs))
+        self.template.write_text(TEMPLATE + '\n')
+        self.touch_later(self.template)
+        inputs = manifest.page_inputs(self.content / 'index.md', self.template, '/', RENDERER_VERSION)
+        self.assertFalse(manifest.is_fresh(self.public / 'index.html', inputs))
+
+    def test_renderer_change_rebuilds_all(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        with mock.patch.object(main, 'RENDERER_VERSION', RENDERER_VERSION + 1), redirect_stdout(io.StringIO()):
+            self.assertEqual(generate_pages_recursive(self.content, self.template, self.public, '/', manifest), 2)
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        (self.public / 'index.html').unlink()
+        self.build()
+        self.assertTrue((self.public / 'index.html').exists())
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        (self.content / 'blog' / 'post.md').unlink()
+        manifest, removed = self.build()
+        self.assertEqual(removed, [str(self.public / 'blog' / 'post.html')])
+        self.assertFalse((self.public / 'blog' / 'post.html').exists())
+        self.assertNotIn(str(self.public / 'blog' / 'post.html'), manifest.outputs)
+
+    def test_removed_output_prunes_empty_directories(self):
+        (self.content / 'blog' / 'tom').mkdir()
+        (self.content / 'blog' / 'tom' / 'index.md').write_text('# Tom')
+        self.build()
+        (self.content / 'blog' / 'tom' / 'index.md').unlink()
+        _, removed = self.build()
+        self.assertEqual(removed, [str(self.public / 'blog' / 'tom' / 'index.html')])
+        self.assertFalse((self.public / 'blog' / 'tom').exists())
+        self.assertTrue((self.public / 'blog' / 'post.html').exists())
+
+    def test_corrupt_manifest_loads_empty(self):
+        self.manifest_path.parent.mkdir(parents=True)
+        self.manifest_path.write_text('{not json')
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.outputs, {})
+
+    def test_save_json_replaces_file(self):
+        path = self.root / 'cache' / 'data.json'
+        save_json(path, {'b': 1, 'a': [2]})
+        self.assertEqual(load_json(path), {'a': [2], 'b': 1})
+        self.assertEqual(list(path.parent.iterdir()), [path])
+        self.assertIsNone(load_json(self.root / 'missing.json'))
+
+    def test_content_index_reads_new_content_and_forgets_unused(self):
+        index = ContentIndex(self.root / 'index.json')
+        self.assertEqual(index.lookup(self.template, lambda path: 'read'), 'read')
+        self.assertEqual(index.lookup(self.template, lambda path: self.fail('read again')), 'read')
+        index.forget_unused()
+        index.save()
+        self.assertEqual(ContentIndex.load(index.path).entries, {hash_text(TEMPLATE): 'read'})
+        index.forget_unused()
+        self.assertEqual(index.entries, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
-import unittest
+import io, os, random, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
 
 from mdhandler import *
 from textnode import TextNode, TextType
+from urlresolver import URLResolver
 
 class TestMdHandler(unittest.TestCase):
     def test_inline_code(self):
@@ -509,5 +512,230 @@ Basic Title
             title = extract_title(md)
         
 
+def six_pass_text_to_textnodes(text):
+    # The pipeline text_to_textnodes used to run, kept as the parity reference
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, '**', TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, '*', TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, '_', TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, '`', TextType.CODE)
+    return nodes
+
+WELL_FORMED_FRAGMENTS = [
+    'plain words ', 'more text', '**bold**', '*star italic*', '_underscore italic_', '`code`',
+    '**bold with * and _ inside**', '`code with (parens)`', '![alt text](/images/a.png)',
+    '[a link](/blog/tom)', '[link **not bold**](https://example.com/x_y)', '(parens)',
+]
+NOISE_FRAGMENTS = ['*', '**', '_', '`', '[', ']', '(', ')', '![', '](', 'x', ' ', '\n']
+
+def regex_block_to_block_type(block):
+    # The regex chain block_to_block_type used to run, kept as the parity reference
+    lines = block.split("\n")
+    for level in range(1, 7):
+        if re.match(rf'^#{{{level}}}\s', block):
+            return BlockType[f'HEADING_{level}']
+    if re.match(r'\A`{3}', block) and re.search(r'`{3}\Z', block):
+        return BlockType.CODE
+    if re.match(r'^>', block):
+        for line in lines:
+            if not line.startswith(">"):
+                return BlockType.PARAGRAPH
+        return BlockType.QUOTE
+    if re.match(r'^-\s', block):
+        for line in lines:
+            if not line.startswith("- "):
+                return BlockType.PARAGRAPH
+        return BlockType.UNORDERED_LIST
+    if re.match(r'^1\.\s', block):
+        i = 1
+        for line in lines:
+            if not line.startswith(f"{i}. "):
+                return BlockType.PARAGRAPH
+            i += 1
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+class TestBlockTypeParity(unittest.TestCase):
+    def test_parity_on_generated_blocks(self):
+        rng = random.Random(11)
+        pieces = ['#', '##', '###', '#######', ' ', '\t', '\xa0', '\n', 'x', '`', '```', '>', '> ',
+                  '-', '- ', '1', '1. ', '2. ', '3. ', '.', '\n- ', '\n> ', '\n2. ']
+        for _ in range(20000):
+            block = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+            self.assertEqual(block_to_block_type(block), regex_block_to_block_type(block), msg=repr(block))
+
+    def test_parity_on_site_blocks(self):
+        content_dir = Path(__file__).resolve().parent.parent / 'content'
+        for path in sorted(content_dir.rglob('*.md')):
+            for block in markdown_to_blocks(read_file(path)):
+                self.assertEqual(block_to_block_type(block), regex_block_to_block_type(block))
+
+class TestInlineTokenizerParity(unittest.TestCase):
+    def assert_parity(self, text):
+        try:
+            expected = six_pass_text_to_textnodes(text)
+        except ValueError:
+            with self.assertRaises(ValueError, msg=repr(text)):
+                text_to_textnodes(text)
+            return False
+        except IndexError:
+            # The old split_nodes_* crash on an unmatched leading '[' / '!['
+            return False
+        self.assertEqual(text_to_textnodes(text), expected, msg=repr(text))
+        return True
+
+    def test_parity_on_site_content(self):
+        content_dir = Path(__file__).resolve().parent.parent / 'content'
+        for path in sorted(content_dir.rglob('*.md')):
+            for line in read_file(path).split('\n'):
+                self.assert_parity(line)
+
+    def test_parity_on_generated_well_formed_corpus(self):
+        rng = random.Random(5)
+        for _ in range(3000):
+            line = ' '.join(rng.choice(WELL_FORMED_FRAGMENTS) for _ in range(rng.randint(1, 12)))
+            self.assertTrue(self.assert_parity(line))
+
+    def test_parity_on_generated_noisy_corpus(self):
+        rng = random.Random(7)
+        fragments = WELL_FORMED_FRAGMENTS + NOISE_FRAGMENTS
+        compared = 0
+        for _ in range(20000):
+            line = ''.join(rng.choice(fragments) for _ in range(rng.randint(1, 10)))
+            compared += self.assert_parity(line)
+        self.assertGreater(compared, 1000)
+
+    def test_bracket_heavy_line(self):
+        line = 'x ' + '![' * 200 + '](' * 200 + ' text'
+        self.assertEqual(text_to_textnodes(line), six_pass_text_to_textnodes(line))
+        # Far past the size the backtracking regexes can handle
+        line = 'x ' + '![' * 100000 + '](' * 100000 + ' text'
+        self.assertEqual(text_to_textnodes(line), [TextNode(line, TextType.TEXT)])
+
+class TestStreamingBlocks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.markdown = read_file(Path(__file__).resolve().parent.parent / 'content' / 'index.md')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, name='page.md'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        rng = random.Random(3)
+        pieces = ['a', 'b c', '# h', ' ', '  ', '\n', '\n\n', '\n\n\n', '- x']
+        for _ in range(3000):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            expected = markdown_to_blocks(text)
+            self.assertEqual(list(iter_blocks(io.StringIO(text))), expected, msg=repr(text))
+            chunks = [text[i:i + 2] for i in range(0, len(text), 2)]
+            self.assertEqual(list(iter_blocks(chunks)), expected, msg=repr(text))
+
+    def test_iter_markdown_blocks_lines_and_mmap(self):
+        for text in [self.markdown, '', 'a\n\n\n', 'a\r\n\r\nb\r\n']:
+            path = self.write(text)
+            expected = markdown_to_blocks(read_file(path))
+            self.assertEqual(list(iter_markdown_blocks(path)), expected)
+            self.assertEqual(list(iter_markdown_blocks(path, use_mmap=True)), expected)
+
+    def test_iter_markdown_html_matches_tree(self):
+        self.assertEqual(
+            ''.join(iter_markdown_html(markdown_to_blocks(self.markdown))),
+            markdown_to_html_node(self.markdown).to_html()
+        )
+
+    def test_extract_title_from_blocks_stops_at_first_heading(self):
+        def blocks():
+            yield 'intro'
+            yield '# Title'
+            raise AssertionError('read past the title')
+        self.assertEqual(extract_title_from_blocks(blocks()), 'Title')
+
+    def test_generate_page_streaming_matches_in_memory(self):
+        import mdhandler
+        source = self.write(self.markdown)
+        template = self.write('<title>{{ Title }}</title>{{ Content }}', 'template.html')
+        outputs = []
+        threshold = mdhandler.STREAMING_THRESHOLD
+        try:
+            for mdhandler.STREAMING_THRESHOLD in (threshold, 0):
+                dest = os.path.join(self.tmp.name, f'out{len(outputs)}.html')
+                with redirect_stdout(io.StringIO()):
+                    generate_page(source, template, dest, '/docs/')
+                outputs.append(read_file(dest))
+        finally:
+            mdhandler.STREAMING_THRESHOLD = threshold
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_generate_page_failure_leaves_no_output(self):
+        import mdhandler
+        source = self.write('# Title\n\nfine\n\nunclosed **bold')
+        template = self.write('{{ Content }}', 'template.html')
+        dest = os.path.join(self.tmp.name, 'out.html')
+        threshold = mdhandler.STREAMING_THRESHOLD
+        try:
+            for mdhandler.STREAMING_THRESHOLD in (threshold, 0):
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaises(ValueError):
+                        generate_page(source, template, dest)
+                self.assertFalse(os.path.exists(dest))
+        finally:
+            mdhandler.STREAMING_THRESHOLD = threshold
+
+class TestInlineCache(unittest.TestCase):
+    def test_hits_misses_and_output(self):
+        cache = InlineCache(8)
+        line = 'See [home](/) and **bold**'
+        self.assertEqual(cache.render(line), 'See <a href="/">home</a> and <b>bold</b>')
+        self.assertEqual(cache.render(line), cache.render(line))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_keyed_on_resolver(self):
+        cache = InlineCache(8)
+        self.assertEqual(cache.render('[a](/x)'), '<a href="/x">a</a>')
+        self.assertEqual(cache.render('[a](/x)', URLResolver('/docs/')), '<a href="/docs/x">a</a>')
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = InlineCache(2)
+        cache.render('a')
+        cache.render('b')
+        cache.render('a')
+        cache.render('c')
+        self.assertEqual([line for line, _ in cache.entries], ['a', 'c'])
+        cache.resize(1)
+        self.assertEqual([line for line, _ in cache.entries], ['c'])
+
+    def test_zero_size_disables(self):
+        cache = InlineCache(0)
+        cache.render('a')
+        cache.render('a')
+        self.assertEqual((cache.hits, cache.misses, len(cache.entries)), (0, 2, 0))
+
+    def test_negative_resize_empties(self):
+        cache = InlineCache(2)
+        cache.render('a')
+        cache.resize(-1)
+        self.assertEqual((cache.maxsize, len(cache.entries)), (0, 0))
+
+    def test_repeated_lines_render_the_same(self):
+        markdown = '- [Home](/)\n- [Blog](/blog)\n\n> _quote_\n\nfooter **text**\n\n- [Home](/)\n- [Blog](/blog)\n\nfooter **text**'
+        INLINE_CACHE.clear()
+        cached = markdown_to_html_node(markdown).to_html()
+        self.assertGreater(INLINE_CACHE.hits, 0)
+        size = INLINE_CACHE.maxsize
+        set_inline_cache_size(0)
+        try:
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), cached)
+        finally:
+            set_inline_cache_size(size)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
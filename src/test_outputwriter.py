@@ -0,0 +1,92 @@
+import io, os, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from buildreport import BuildReport
+from main import generate_pages_recursive
+from mdhandler import generate_page
+from outputwriter import OutputWriter, write_chunks_if_changed, write_if_changed
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.path = self.root / 'page.html'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def age(self, path):
+        os.utime(path, ns=(0, 10**18))
+
+    def test_identical_content_is_not_rewritten(self):
+        self.assertFalse(write_if_changed(self.path, b'<p>a</p>'))
+        self.age(self.path)
+        self.assertTrue(write_if_changed(self.path, b'<p>a</p>'))
+        self.assertEqual(self.path.stat().st_mtime_ns, 10**18)
+
+    def test_changed_content_is_replaced(self):
+        write_if_changed(self.path, b'<p>a</p>')
+        self.age(self.path)
+        self.assertFalse(write_if_changed(self.path, b'<p>b</p>'))
+        self.assertEqual(self.path.read_bytes(), b'<p>b</p>')
+        self.assertNotEqual(self.path.stat().st_mtime_ns, 10**18)
+        self.assertEqual(os.listdir(self.root), ['page.html'])
+
+    def test_streamed_chunks(self):
+        self.assertFalse(write_chunks_if_changed(self.path, iter(['<p>', 'é', '</p>'])))
+        self.assertTrue(write_chunks_if_changed(self.path, iter(['<p>é', '</p>'])))
+        self.assertEqual(self.path.read_text(encoding='utf-8'), '<p>é</p>')
+        self.assertEqual(os.listdir(self.root), ['page.html'])
+
+    def test_failed_stream_keeps_old_file(self):
+        write_if_changed(self.path, b'old')
+        def chunks():
+            yield 'new'
+            raise ValueError('render failed')
+        with self.assertRaises(ValueError):
+            write_chunks_if_changed(self.path, chunks())
+        self.assertEqual(self.path.read_bytes(), b'old')
+        self.assertEqual(os.listdir(self.root), ['page.html'])
+
+    def test_background_writes(self):
+        write_if_changed(self.root / 'same.html', b'same')
+        writer = OutputWriter(workers=2)
+        writer.submit(self.root / 'same.html', b'same')
+        writer.submit(self.root / 'new.html', b'new')
+        writer.submit(self.root / 'missing' / 'x.html', b'x')
+        errors = writer.close()
+        self.assertEqual(list(errors), [str(self.root / 'missing' / 'x.html')])
+        self.assertEqual(writer.unchanged, {str(self.root / 'same.html')})
+        self.assertEqual(writer.written, {str(self.root / 'new.html')})
+        self.assertEqual((self.root / 'new.html').read_bytes(), b'new')
+
+    def test_render_failure_keeps_existing_page(self):
+        source = self.root / 'page.md'
+        source.write_text('no title here')
+        template = self.root / 'template.html'
+        template.write_text('{{ Content }}')
+        self.path.write_text('previous')
+        with self.assertRaises(Exception):
+            generate_page(str(source), str(template), str(self.path), verbose=False)
+        self.assertEqual(self.path.read_text(), 'previous')
+
+    def test_rebuild_reports_unchanged_pages(self):
+        content = self.root / 'content'
+        content.mkdir()
+        (content / 'index.md').write_text('# Home')
+        template = self.root / 'template.html'
+        template.write_text('{{ Content }}')
+        public = self.root / 'public'
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content, template, public, '/')
+        self.age(public / 'index.html')
+        report = BuildReport()
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content, template, public, '/', report=report)
+        self.assertTrue(report.pages[0].output_unchanged)
+        self.assertEqual(report.totals()['unchanged_outputs'], 1)
+        self.assertEqual((public / 'index.html').stat().st_mtime_ns, 10**18)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import gzip, os, tempfile, unittest
+from pathlib import Path
+from unittest import mock
+
+import precompress
+from precompress import available_formats, compress_file, precompress_tree
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'blog').mkdir()
+        (self.root / 'index.html').write_text('<p>home</p>' * 50)
+        (self.root / 'blog' / 'index.html').write_text('<p>blog</p>' * 50)
+        (self.root / 'index.css').write_text('body { color: red; }\n' * 20)
+        (self.root / 'logo.png').write_bytes(b'\x89PNG')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compresses_text_files_only(self):
+        self.assertEqual(precompress_tree(self.root, 2), (3, 0, 0))
+        for name in ['index.html', 'blog/index.html', 'index.css']:
+            source = self.root / name
+            compressed = self.root / f'{name}.gz'
+            self.assertEqual(gzip.decompress(compressed.read_bytes()), source.read_bytes())
+            self.assertEqual(compressed.stat().st_mtime_ns, source.stat().st_mtime_ns)
+        self.assertFalse((self.root / 'logo.png.gz').exists())
+
+    def test_output_is_deterministic(self):
+        path = self.root / 'index.html'
+        compress_file(path)
+        first = (self.root / 'index.html.gz').read_bytes()
+        os.remove(self.root / 'index.html.gz')
+        compress_file(path)
+        self.assertEqual((self.root / 'index.html.gz').read_bytes(), first)
+
+    def test_unchanged_files_are_skipped(self):
+        precompress_tree(self.root)
+        self.assertEqual(precompress_tree(self.root), (0, 3, 0))
+        page = self.root / 'index.html'
+        page.write_text('<p>changed</p>')
+        os.utime(page, ns=(0, page.stat().st_mtime_ns + 10**9))
+        self.assertEqual(precompress_tree(self.root), (1, 2, 0))
+        self.assertEqual(gzip.decompress((self.root / 'index.html.gz').read_bytes()), b'<p>changed</p>')
+
+    def test_orphaned_copies_are_removed(self):
+        precompress_tree(self.root)
+        (self.root / 'blog' / 'index.html').unlink()
+        (self.root / 'archive.tar.gz').write_bytes(b'keep')
+        self.assertEqual(precompress_tree(self.root), (0, 2, 1))
+        self.assertFalse((self.root / 'blog' / 'index.html.gz').exists())
+        self.assertTrue((self.root / 'archive.tar.gz').exists())
+
+    def test_brotli_used_when_available(self):
+        fake = mock.Mock()
+        fake.compress.side_effect = lambda data, quality: b'br:' + data
+        with mock.patch.object(precompress, 'brotli', fake):
+            self.assertEqual(set(available_formats()), {'.gz', '.br'})
+            precompress_tree(self.root)
+        self.assertEqual((self.root / 'index.css.br').read_bytes(), b'br:' + (self.root / 'index.css').read_bytes())
+
+if __name__ == "__main__":
+    unittest.main()
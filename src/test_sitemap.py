@@ -0,0 +1,87 @@
+import io, os, tempfile, unittest
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import sitemap
+from blogindex import PostIndex
+from main import build_blog_index, generate_pages_recursive
+from manifest import BuildManifest
+from sitemap import ATOM_NS, SITEMAP_NS, write_site_files
+from urlresolver import URLResolver
+
+class TestSiteFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        (self.content / 'blog' / 'old').mkdir(parents=True)
+        (self.content / 'blog' / 'new').mkdir()
+        (self.content / 'index.md').write_text('# Home')
+        (self.content / 'blog' / 'old' / 'index.md').write_text('---\ndate: 2023-01-05\n---\n# Old & gold')
+        (self.content / 'blog' / 'new' / 'index.md').write_text('---\ndate: 2024-06-01\ntags: [a, b]\n---\n# New')
+        self.template = self.root / 'template.html'
+        self.template.write_text('{{ Content }}')
+        self.public = self.root / 'public'
+        self.manifest = BuildManifest(self.root / 'manifest.json')
+        self.posts = PostIndex(self.root / 'posts.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath='/'):
+        resolver = URLResolver(basepath)
+        self.manifest.seen.clear()
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.public, basepath, self.manifest, quiet=True)
+            build_blog_index(self.content, self.template, self.public, resolver, self.manifest, self.posts,
+                             quiet=True)
+            counts = write_site_files(self.public, self.manifest, resolver, 'https://example.com/', quiet=True)
+        self.manifest.remove_stale()
+        return counts
+
+    def locs(self, name='sitemap.xml'):
+        tree = ET.parse(self.public / name)
+        return [loc.text for loc in tree.iter(f'{{{SITEMAP_NS}}}loc')]
+
+    def test_sitemap_and_feed(self):
+        self.assertEqual(self.build('/docs/'), (2, 0))
+        self.assertEqual(self.locs(), ['https://example.com/docs/', 'https://example.com/docs/blog',
+                                       'https://example.com/docs/blog/new', 'https://example.com/docs/blog/old'])
+        feed = ET.parse(self.public / 'blog' / 'feed.xml').getroot()
+        entries = feed.findall(f'{{{ATOM_NS}}}entry')
+        self.assertEqual([entry.find(f'{{{ATOM_NS}}}title').text for entry in entries], ['New', 'Old & gold'])
+        self.assertEqual(entries[0].find(f'{{{ATOM_NS}}}updated').text, '2024-06-01T00:00:00Z')
+        self.assertEqual([category.get('term') for category in entries[0].iter(f'{{{ATOM_NS}}}category')],
+                         ['a', 'b'])
+        self.assertEqual(feed.find(f'{{{ATOM_NS}}}updated').text, '2024-06-01T00:00:00Z')
+
+    def test_unchanged_metadata_rewrites_nothing(self):
+        self.build()
+        feed = self.public / 'blog' / 'feed.xml'
+        os.utime(feed, ns=(0, 0))
+        self.assertEqual(self.build(), (0, 2))
+        self.assertEqual(feed.stat().st_mtime_ns, 0)
+        (self.content / 'blog' / 'old' / 'index.md').write_text('---\ndate: 2023-01-05\n---\n# Renamed')
+        self.assertEqual(self.build(), (2, 0))
+        self.assertIn('Renamed', feed.read_text())
+
+    def test_deleted_post_is_dropped_in_the_same_build(self):
+        self.build()
+        (self.content / 'blog' / 'old' / 'index.md').unlink()
+        self.assertEqual(self.build(), (2, 0))
+        self.assertNotIn('https://example.com/blog/old', self.locs())
+        self.assertNotIn('/blog/old', (self.public / 'blog' / 'feed.xml').read_text())
+
+    def test_large_sitemap_is_split_under_an_index(self):
+        with mock.patch.object(sitemap, 'SITEMAP_URL_LIMIT', 3):
+            self.build()
+        self.assertEqual(self.locs(), ['https://example.com/sitemap-1.xml', 'https://example.com/sitemap-2.xml'])
+        self.assertEqual(len(self.locs('sitemap-1.xml')) + len(self.locs('sitemap-2.xml')), 4)
+        self.build()
+        self.assertEqual(len(self.locs()), 4)
+        self.assertFalse((self.public / 'sitemap-1.xml').exists())
+
+if __name__ == "__main__":
+    unittest.main()
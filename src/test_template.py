@@ -0,0 +1,69 @@
+import os, tempfile, unittest
+
+from template import Template, load_template
+from urlresolver import URLResolver
+
+class TestTemplate(unittest.TestCase):
+    def test_render_title_and_content(self):
+        template = Template('<title>{{ Title }}</title><article>{{ Content }}</article>')
+        self.assertEqual(
+            template.render({'Title': 'Home', 'Content': '<p>Hi</p>'}),
+            '<title>Home</title><article><p>Hi</p></article>'
+        )
+
+    def test_placeholders(self):
+        template = Template('{{ Title }} {{Date}} {{  Tags  }}')
+        self.assertEqual(template.placeholders, ['Title', 'Date', 'Tags'])
+
+    def test_repeated_placeholder(self):
+        template = Template('<title>{{ Title }}</title><h1>{{ Title }}</h1>')
+        self.assertEqual(template.render({'Title': 'A'}), '<title>A</title><h1>A</h1>')
+
+    def test_unknown_placeholder_left_as_written(self):
+        template = Template('<p>{{ Date }}</p>{{ Content }}')
+        self.assertEqual(template.render({'Content': 'x'}), '<p>{{ Date }}</p>x')
+
+    def test_values_are_not_rescanned(self):
+        template = Template('{{ Title }}|{{ Content }}')
+        self.assertEqual(
+            template.render({'Title': '{{ Content }}', 'Content': 'body'}),
+            '{{ Content }}|body'
+        )
+
+    def test_iter_render_streams_chunk_values(self):
+        template = Template('<title>{{ Title }}</title>{{ Content }}{{ Missing }}')
+        pieces = list(template.iter_render({'Title': 'T', 'Content': iter(['<p>', 'x', '</p>'])}))
+        self.assertEqual(''.join(pieces), '<title>T</title><p>x</p>{{ Missing }}')
+        self.assertIn('x', pieces)
+
+    def test_basepath_rewrites_literals_at_compile_time(self):
+        template = Template('<link href="/index.css" /><img src="/a.png" />{{ Content }}', '/blog/')
+        self.assertEqual(
+            template.render({'Content': ''}),
+            '<link href="/blog/index.css" /><img src="/blog/a.png" />'
+        )
+
+    def test_resolver_sends_template_images_to_prefix(self):
+        resolver = URLResolver('/blog/', 'https://cdn.example.com')
+        template = Template('<link href="/index.css" /><img alt="" src="/a.png" />', resolver=resolver)
+        self.assertEqual(
+            template.render({}),
+            '<link href="/blog/index.css" /><img alt="" src="https://cdn.example.com/a.png" />'
+        )
+
+    def test_load_template_reuses_compiled_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'template.html')
+            with open(path, 'w') as file:
+                file.write('<title>{{ Title }}</title>')
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, '/docs/'), first)
+            self.assertIs(load_template(path, resolver=URLResolver('/')), first)
+            with open(path, 'w') as file:
+                file.write('<h1>{{ Title }}</h1>')
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            self.assertEqual(load_template(path).render({'Title': 'T'}), '<h1>T</h1>')
+
+if __name__ == "__main__":
+    unittest.main()
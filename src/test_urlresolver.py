@@ -0,0 +1,106 @@
+import io, tempfile, unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from mdhandler import generate_page, markdown_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node
+from urlresolver import URLResolver
+
+class TestURLResolver(unittest.TestCase):
+    def test_link_prefixes_root_relative_only(self):
+        resolver = URLResolver('/docs/')
+        self.assertEqual(resolver.link('/a/b'), '/docs/a/b')
+        self.assertEqual(resolver.link('/'), '/docs/')
+        for url in ['a/b', '../x', '#top', 'https://example.com/x', '//cdn.example.com/x', '']:
+            self.assertEqual(resolver.link(url), url)
+
+    def test_image_prefix(self):
+        resolver = URLResolver('/docs/', 'https://cdn.example.com/site/')
+        self.assertEqual(resolver.image('/images/a.png'), 'https://cdn.example.com/site/images/a.png')
+        self.assertEqual(resolver.image('images/a.png'), 'images/a.png')
+        self.assertEqual(resolver.link('/images/a.png'), '/docs/images/a.png')
+        self.assertEqual(URLResolver('/', 'https://cdn.example.com').image('/a.png'), 'https://cdn.example.com/a.png')
+
+    def test_key_and_equality(self):
+        self.assertEqual(URLResolver('/docs/').key, '/docs/')
+        self.assertNotEqual(URLResolver('/docs/', 'https://cdn.example.com').key, '/docs/')
+        self.assertEqual(URLResolver('/docs/'), URLResolver('/docs/'))
+        self.assertEqual(len({URLResolver('/'), URLResolver('/'), URLResolver('/x/')}), 2)
+
+    def test_fingerprinted_assets(self):
+        assets = {'/index.css': '/index.1234abcd.css', '/a.png': '/a.5678abcd.png'}
+        resolver = URLResolver('/docs/', 'https://cdn.example.com', assets)
+        self.assertEqual(resolver.link('/index.css?v=2#x'), '/docs/index.1234abcd.css?v=2#x')
+        self.assertEqual(resolver.image('/a.png'), 'https://cdn.example.com/a.5678abcd.png')
+        self.assertEqual(resolver.link('/other.css'), '/docs/other.css')
+        self.assertEqual(URLResolver('/', assets=assets).rewrite_html('<link href="/index.css">'),
+                         '<link href="/index.1234abcd.css">')
+        self.assertNotEqual(URLResolver(assets=assets), URLResolver(assets={'/index.css': '/index.0.css'}))
+
+    def test_links_key_covers_only_used_assets(self):
+        assets = {'/index.css': '/index.1234abcd.css', '/a.png': '/a.5678abcd.png'}
+        resolver = URLResolver('/docs/', assets=assets)
+        changed = URLResolver('/docs/', assets=dict(assets, **{'/a.png': '/a.0.png'}))
+        self.assertEqual(resolver.key, '/docs/')
+        self.assertEqual(resolver.links_key([('link', '/about')]), '/docs/')
+        self.assertEqual(resolver.links_key([('link', '/index.css')]), changed.links_key([('link', '/index.css')]))
+        self.assertNotEqual(resolver.links_key([('image', '/a.png?v=1')]), changed.links_key([('image', '/a.png')]))
+        self.assertEqual(resolver.html_links('<link href="/index.css"><img alt="" src="/a.png"><a href="x">'),
+                         [('link', '/index.css'), ('image', '/a.png')])
+
+    def test_image_props(self):
+        resolver = URLResolver('/docs/', image_sizes={'/a.png': (640, 480)})
+        self.assertEqual(
+            text_node_to_html_node(TextNode('alt', TextType.IMAGE, '/a.png?v=1'), resolver).to_html(),
+            '<img src="/docs/a.png?v=1" alt="alt" width="640" height="480" loading="lazy" decoding="async" />'
+        )
+        self.assertEqual(resolver.image_props('https://example.com/b.png', 'b'), {
+            'src': 'https://example.com/b.png', 'alt': 'b', 'loading': 'lazy', 'decoding': 'async',
+        })
+        self.assertEqual(URLResolver('/docs/').image_props('/a.png', 'a'), {'src': '/docs/a.png', 'alt': 'a'})
+        resized = URLResolver('/docs/', image_sizes={'/a.png': (1, 1)})
+        self.assertEqual(resolver.key, resized.key)
+        self.assertNotEqual(resolver, resized)
+        self.assertNotEqual(resolver.links_key([('image', '/a.png')]), resized.links_key([('image', '/a.png')]))
+        self.assertEqual(resolver.links_key([('link', '/a.png'), ('image', '/b.png')]), resolver.key)
+        self.assertNotEqual(resolver.key, URLResolver('/docs/').key)
+
+    def test_rewrite_html(self):
+        resolver = URLResolver('/docs/', 'https://cdn.example.com')
+        html = '<a href="/x">/x</a> <img src="/a.png"> <script src="/app.js"></script> <a href="//y">'
+        self.assertEqual(
+            resolver.rewrite_html(html),
+            '<a href="/docs/x">/x</a> <img src="https://cdn.example.com/a.png"> '
+            '<script src="/docs/app.js"></script> <a href="//y">'
+        )
+        self.assertIs(URLResolver().rewrite_html(html), html)
+
+    def test_text_node_props(self):
+        resolver = URLResolver('/docs/', 'https://cdn.example.com')
+        link = text_node_to_html_node(TextNode('x', TextType.LINK, '/a'), resolver)
+        image = text_node_to_html_node(TextNode('alt', TextType.IMAGE, '/a.png'), resolver)
+        self.assertEqual(link.to_html(), '<a href="/docs/a">x</a>')
+        self.assertEqual(image.to_html(), '<img src="https://cdn.example.com/a.png" alt="alt" />')
+
+    def test_markdown_text_is_not_rewritten(self):
+        markdown = '[home](/) and ![pic](/a.png)\n\n```\n<a href="/raw">\n```\n\n> src="/quoted"'
+        html = markdown_to_html_node(markdown, URLResolver('/docs/')).to_html()
+        self.assertIn('<a href="/docs/">home</a>', html)
+        self.assertIn('<img src="/docs/a.png" alt="pic" />', html)
+        self.assertIn('<a href="/raw">', html)
+        self.assertIn('src="/quoted"', html)
+
+    def test_generate_page_resolves_template_and_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / 'page.md').write_text('# Title\n\n[a](/a) `href="/b"`')
+            (root / 'template.html').write_text('<link href="/index.css">{{ Content }}')
+            with redirect_stdout(io.StringIO()):
+                generate_page(str(root / 'page.md'), str(root / 'template.html'), str(root / 'page.html'), '/sw/')
+            html = (root / 'page.html').read_text()
+        self.assertIn('<link href="/sw/index.css">', html)
+        self.assertIn('<a href="/sw/a">a</a>', html)
+        self.assertIn('<code>href="/b"</code>', html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ('text', 'text_type', 'url')
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = TextType(text_type)
@@ -22,7 +24,7 @@ class TextNode:
     def __repr__(self):
         return f'TextNode({self.text}, {self.text_type.value}, {self.url})'
     
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolver=None):
     if text_node.text_type == TextType.TEXT:
         return LeafNode(value=text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -32,8 +34,10 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode(tag=text_node.text_type.value, value=text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode(tag=text_node.text_type.value, value=text_node.text, props={'href':text_node.url})
+        return LeafNode(tag=text_node.text_type.value, value=text_node.text, props={'href':resolver.link(text_node.url) if resolver else text_node.url})
     elif text_node.text_type == TextType.IMAGE:
+        if resolver is not None:
+            return LeafNode(tag=text_node.text_type.value, props=resolver.image_props(text_node.url, text_node.text))
         return LeafNode(tag=text_node.text_type.value, props={'src':text_node.url,'alt':text_node.text})
     else:
         raise ValueError("text_type must be valid type")
\ No newline at end of file
@@ -0,0 +1,127 @@
+import json, re
+
+from manifest import hash_text
+
+ROOT_URL_ATTR_RE = re.compile(r'\b(href|src)="(/(?!/)[^"]*)"')
+TAG_RE = re.compile(r'<(\w+)\b[^>]*>')
+
+def _mapping_key(mapping):
+    return hash_text(json.dumps(mapping, sort_keys=True))
+
+def _strip_query(url):
+    end = len(url)
+    for mark in '?#':
+        index = url.find(mark)
+        if index != -1:
+            end = min(end, index)
+    return url[:end], url[end:]
+
+class URLResolver:
+    """Maps root-relative URLs (`/x`) to where the site is actually served.
+
+    Links and other assets get `basepath` in front; images get
+    `image_prefix` instead when one is set, e.g. an absolute CDN URL.
+    `assets` maps static file URLs to their fingerprinted names (see
+    assets.fingerprint_assets) and is applied first. Relative, absolute
+    and protocol-relative URLs are left alone.
+
+    `image_sizes` maps image URLs to (width, height) (see
+    imageindex.ImageIndex); when given, images also get their size and
+    lazy-loading attributes.
+
+    `key` covers only the settings every page shares; `links_key` adds the
+    fingerprinted names and image sizes of the URLs one page actually uses.
+    """
+    __slots__ = ('basepath', 'image_prefix', 'assets', 'image_sizes', 'key', '_settings')
+
+    def __init__(self, basepath='/', image_prefix=None, assets=None, image_sizes=None):
+        self.basepath = basepath
+        self.image_prefix = image_prefix.rstrip('/') + '/' if image_prefix else None
+        self.assets = assets or {}
+        self.image_sizes = image_sizes
+        # Identifies the settings pages were built with; plain basepath for
+        # the default so existing build manifests stay valid
+        key = basepath
+        if self.image_prefix is not None:
+            key += f' images={self.image_prefix}'
+        if image_sizes is not None:
+            key += ' sizes'
+        self.key = key
+        # Equal resolvers resolve every URL alike, e.g. for the template cache
+        self._settings = (key, _mapping_key(self.assets), _mapping_key(image_sizes or {}))
+
+    @property
+    def is_identity(self):
+        return self.basepath == '/' and self.image_prefix is None and not self.assets
+
+    def __eq__(self, other):
+        return isinstance(other, URLResolver) and self._settings == other._settings
+
+    def __hash__(self):
+        return hash(self._settings)
+
+    def __repr__(self):
+        return f'URLResolver({self.basepath!r}, {self.image_prefix!r}, {len(self.assets)} assets)'
+
+    def _fingerprinted(self, url):
+        path, rest = _strip_query(url)
+        hashed = self.assets.get(path)
+        return url if hashed is None else hashed + rest
+
+    def links_key(self, links):
+        """`key` plus the fingerprinted names and image sizes of the given (kind, url) links.
+
+        A page's output depends on this rather than on the whole asset map
+        and image index, so a changed static file only invalidates the pages
+        that use it.
+        """
+        used = {}
+        for kind, url in links:
+            path = _strip_query(url)[0]
+            if path in self.assets:
+                used[path] = self.assets[path]
+            if kind == 'image' and self.image_sizes is not None and path in self.image_sizes:
+                used[f'{path} size'] = list(self.image_sizes[path])
+        return f'{self.key} urls={_mapping_key(used)}' if used else self.key
+
+    def html_links(self, html):
+        """The (kind, url) of the root-relative href/src attributes in `html`, as rewrite_html sees them."""
+        links = []
+        for tag in TAG_RE.finditer(html):
+            kind = 'image' if tag.group(1).lower() == 'img' else 'link'
+            links.extend((kind, attr.group(2)) for attr in ROOT_URL_ATTR_RE.finditer(tag.group(0)))
+        return links
+
+    def link(self, url):
+        if url and url[0] == '/' and url[1:2] != '/':
+            if self.assets:
+                url = self._fingerprinted(url)
+            return self.basepath + url[1:]
+        return url
+
+    def image(self, url):
+        if self.image_prefix is not None and url and url[0] == '/' and url[1:2] != '/':
+            if self.assets:
+                url = self._fingerprinted(url)
+            return self.image_prefix + url[1:]
+        return self.link(url)
+
+    def image_props(self, url, alt):
+        props = {'src': self.image(url), 'alt': alt}
+        if self.image_sizes is not None:
+            size = self.image_sizes.get(_strip_query(url)[0])
+            if size is not None:
+                props['width'], props['height'] = size
+            props['loading'] = 'lazy'
+            props['decoding'] = 'async'
+        return props
+
+    def _rewrite_tag(self, match):
+        resolve = self.image if match.group(1).lower() == 'img' else self.link
+        return ROOT_URL_ATTR_RE.sub(lambda attr: f'{attr.group(1)}="{resolve(attr.group(2))}"', match.group(0))
+
+    def rewrite_html(self, html):
+        """Resolve root-relative href/src attributes in hand-written HTML such as a template."""
+        if self.is_identity:
+            return html
+        return TAG_RE.sub(self._rewrite_tag, html)